@@ -1,17 +1,338 @@
 # -*- coding: utf-8 -*-
 
-from odoo import http
-from odoo.http import request, Response
-import json
+from odoo import api, http, SUPERUSER_ID, _
+from odoo.exceptions import UserError
+from odoo.http import request, Response, JsonRPCDispatcher, Request
+from odoo.modules.registry import Registry
+from odoo.tools import date_utils
+from odoo.tools.lru import LRU
+from werkzeug.wsgi import wrap_file
+from lxml import etree
 import logging
-import base64
+import functools
+import hashlib
 import zipfile
-import io
 import tempfile
-import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+from ..tools.json_utils import orjson, json_dumps, json_loads
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 _logger = logging.getLogger(__name__)
 
+# JSON-RPC routes served by this controller
+_QA_JSON_PREFIX = '/qa_test/'
+
+# Dashboard (etag, payload) per (db, uid, company), reused for a few seconds so
+# that auto-refreshing clients do not re-run the dashboard queries on every poll.
+_DASHBOARD_CACHE_TTL = 10
+_DASHBOARD_CACHE = LRU(256)
+
+# qa.test.result columns exposed by the run results endpoints
+_RESULT_FIELDS = ['test_case_id', 'status', 'duration', 'message']
+
+_MSGPACK_CONTENT_TYPE = 'application/vnd.msgpack'
+_MSGPACK_MIMETYPES = ('application/vnd.msgpack', 'application/msgpack', 'application/x-msgpack')
+
+
+def _wants_msgpack(httprequest):
+    """Whether the client asked for MessagePack (Accept header or ?format=msgpack)"""
+    if ormsgpack is None:
+        return False
+    if httprequest.args.get('format') == 'msgpack':
+        return True
+    return 'msgpack' in httprequest.headers.get('Accept', '')
+
+
+def _is_msgpack_body(httprequest):
+    return ormsgpack is not None and httprequest.mimetype in _MSGPACK_MIMETYPES
+
+
+def _encode_payload(payload, httprequest):
+    """Encode payload for the client, returns (body, content_type)"""
+    if _wants_msgpack(httprequest):
+        return ormsgpack.packb(payload, default=date_utils.json_default), _MSGPACK_CONTENT_TYPE
+    return json_dumps(payload), 'application/json; charset=utf-8'
+
+
+if msgspec is not None:
+    class _RunRequest(msgspec.Struct):
+        """Parameters of the legacy run creation endpoint"""
+        suite_id: Optional[int] = None
+        test_case_ids: List[int] = []
+        environment: str = 'local'
+        auto_execute: bool = False
+        name: str = 'API Run'
+
+
+def _parse_run_request(params):
+    """Validate and coerce the api_create_run parameters"""
+    if msgspec is not None:
+        return msgspec.convert(params, type=_RunRequest, strict=False)
+    return SimpleNamespace(
+        suite_id=params.get('suite_id'),
+        test_case_ids=params.get('test_case_ids', []),
+        environment=params.get('environment', 'local'),
+        auto_execute=params.get('auto_execute', False),
+        name=params.get('name', 'API Run'),
+    )
+
+
+def _is_qa_json_request(httprequest):
+    if not httprequest.path.startswith(_QA_JSON_PREFIX):
+        return False
+    return orjson is not None or _wants_msgpack(httprequest) or _is_msgpack_body(httprequest)
+
+
+# Serve the JSON-RPC payloads of our own routes through orjson (or MessagePack
+# when negotiated); every other route keeps Odoo's stdlib json path.
+_base_get_json_data = Request.get_json_data
+_base_json_rpc_response = JsonRPCDispatcher._response
+_base_json_rpc_is_compatible_with = JsonRPCDispatcher.is_compatible_with.__func__
+
+
+def _qa_get_json_data(self):
+    if not _is_qa_json_request(self.httprequest):
+        return _base_get_json_data(self)
+    if _is_msgpack_body(self.httprequest):
+        try:
+            return ormsgpack.unpackb(self.httprequest.get_data())
+        except ormsgpack.MsgpackDecodeError as e:
+            raise ValueError(str(e)) from e
+    if orjson is not None:
+        return orjson.loads(self.httprequest.get_data())
+    return _base_get_json_data(self)
+
+
+def _qa_json_rpc_response(self, result=None, error=None):
+    if not _is_qa_json_request(self.request.httprequest):
+        return _base_json_rpc_response(self, result=result, error=error)
+    response = {'jsonrpc': '2.0', 'id': self.request_id}
+    if error is not None:
+        response['error'] = error
+    if result is not None:
+        response['result'] = result
+    body, content_type = _encode_payload(response, self.request.httprequest)
+    return self.request.make_response(body, headers=[('Content-Type', content_type)])
+
+
+@classmethod
+def _qa_json_rpc_is_compatible_with(cls, req):
+    if (req.httprequest.path.startswith(_QA_JSON_PREFIX)
+            and _is_msgpack_body(req.httprequest)):
+        return True
+    return _base_json_rpc_is_compatible_with(cls, req)
+
+
+Request.get_json_data = _qa_get_json_data
+JsonRPCDispatcher._response = _qa_json_rpc_response
+JsonRPCDispatcher.is_compatible_with = _qa_json_rpc_is_compatible_with
+
+
+# Robot Framework keywords shipped with every test download
+_RESOURCE_FILE_BYTES = b"""*** Settings ***
+Library    SeleniumLibrary
+Library    Collections
+Library    String
+Library    DateTime
+
+*** Keywords ***
+Login To Odoo
+    [Arguments]    ${username}    ${password}    ${url}=${SERVER_URL}
+    Open Browser    ${url}/web/login    ${BROWSER}    options=${BROWSER_OPTIONS}
+    Maximize Browser Window
+    Input Text    login    ${username}
+    Input Text    password    ${password}
+    Click Button    xpath=//button[@type='submit']
+    Wait Until Page Contains Element    xpath=//a[contains(@class, 'o_menu_toggle')]    timeout=30s
+
+Logout From Odoo
+    Click Element    xpath=//a[contains(@class, 'o_user_menu')]
+    Click Link    xpath=//a[@data-menu='logout']
+
+Navigate To
+    [Arguments]    @{menu_path}
+    FOR    ${menu}    IN    @{menu_path}
+        Click Link    xpath=//a[contains(@class, 'o_menu_entry_lvl_') and contains(text(), '${menu}')]
+        Sleep    0.5s
+    END
+    Wait Until Page Contains Element    xpath=//div[contains(@class, 'o_content')]    timeout=30s
+
+Click Button With Text
+    [Arguments]    ${text}
+    Click Button    xpath=//button[contains(text(), '${text}') or contains(., '${text}')]
+
+Fill Field
+    [Arguments]    ${field_name}    ${value}
+    Input Text    xpath=//input[@name='${field_name}'] | //textarea[@name='${field_name}']    ${value}
+
+Select Dropdown Value
+    [Arguments]    ${field_name}    ${value}
+    Click Element    xpath=//div[@name='${field_name}']//input
+    Wait Until Element Is Visible    xpath=//ul[contains(@class, 'ui-autocomplete')]
+    Click Element    xpath=//li[contains(text(), '${value}')]
+
+Verify Field Value
+    [Arguments]    ${field_name}    ${expected_value}
+    ${actual}=    Get Value    xpath=//input[@name='${field_name}']
+    Should Be Equal    ${actual}    ${expected_value}
+
+Take Screenshot On Failure
+    [Teardown]    Run Keyword If Test Failed    Capture Page Screenshot
+"""
+
+_VARIABLES_FILE_TEMPLATE = """# -*- coding: utf-8 -*-
+# Generated by QA Test Generator
+
+SERVER_URL = '{base_url}'
+BROWSER = 'chrome'
+BROWSER_OPTIONS = 'add_argument("--headless"); add_argument("--no-sandbox"); add_argument("--disable-dev-shm-usage")'
+
+# Test credentials (override via command line)
+TEST_USER = 'admin'
+TEST_PASSWORD = 'admin'
+
+# Timeouts
+IMPLICIT_WAIT = 10
+PAGE_LOAD_TIMEOUT = 30
+"""
+
+
+# Download members too small to be worth compressing
+_STORED_MEMBERS = frozenset({'tests/resources/variables.py', 'requirements.txt'})
+
+# Member timestamp, fixed so that unchanged suites give byte-identical archives
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Suite archives by (db, suite, last test case change, case count, variables),
+# CI polls the download endpoint for suites that rarely change. At most
+# 8 x 1 MiB per worker, well below the limit_memory_soft recycling threshold.
+_ZIP_CACHE = LRU(8)
+_ZIP_CACHE_MAX_SIZE = 1024 * 1024
+
+# Archives are built in memory, larger ones spill to a temporary file
+_ZIP_SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=16)
+def _variables_file_bytes(base_url):
+    """Render the Robot variables file for a server URL"""
+    return _VARIABLES_FILE_TEMPLATE.format(base_url=base_url).encode()
+
+
+def _zip_info(filename, compress_type):
+    """Archive member header with a fixed timestamp and rw-r--r-- permissions"""
+    info = zipfile.ZipInfo(filename, date_time=_ZIP_DATE_TIME)
+    info.compress_type = compress_type
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _write_zip(fileobj, entries, stored=()):
+    """
+    Write a ZIP archive of (filename, content) entries to fileobj
+    
+    Robot sources are small text files: deflate level 1 keeps nearly all of
+    the ratio of the default level for a fraction of the CPU. Members listed
+    in stored are written uncompressed.
+    """
+    with zipfile.ZipFile(fileobj, 'w') as zip_file:
+        for filename, content in entries:
+            if filename in stored:
+                zip_file.writestr(_zip_info(filename, zipfile.ZIP_STORED), content)
+            else:
+                zip_file.writestr(_zip_info(filename, zipfile.ZIP_DEFLATED), content, compresslevel=1)
+
+
+def _robot_elapsed(status):
+    """Elapsed seconds of a Robot <status> element (RF 7 and older formats)"""
+    elapsed = status.get('elapsed')
+    if elapsed is not None:
+        return float(elapsed)
+    start, end = status.get('starttime'), status.get('endtime')
+    if not start or not end or 'N/A' in (start, end):
+        return 0
+    fmt = '%Y%m%d %H:%M:%S.%f'
+    return (datetime.strptime(end, fmt) - datetime.strptime(start, fmt)).total_seconds()
+
+
+def _iter_robot_output(source):
+    """
+    Stream a Robot Framework output.xml
+    
+    Yields ('test', dict) for every test and finally ('suite', seconds) for
+    the top-level suite. Parsed elements are dropped as soon as they have
+    been read, so memory stays proportional to the nesting depth rather
+    than to the size of the file.
+    """
+    stack = []
+    test = None
+    # Uploaded files are untrusted: no entity expansion nor network access,
+    # and libxml2's default depth and text size limits stay on
+    for event, elem in etree.iterparse(source, events=('start', 'end'), resolve_entities=False,
+                                       no_network=True):
+        if event == 'start':
+            stack.append(elem)
+            if elem.tag == 'test':
+                test = {'name': elem.get('name'), 'tags': []}
+            continue
+        
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if test is not None and parent is not None:
+            if elem.tag == 'status' and parent.tag == 'test':
+                test['status'] = elem.get('status')
+                test['passed'] = test['status'] == 'PASS'
+                test['duration'] = _robot_elapsed(elem)
+                test['message'] = '' if test['passed'] else (elem.text or '')
+            elif elem.tag == 'tag' and (parent.tag == 'test' or (
+                    parent.tag == 'tags' and len(stack) > 1 and stack[-2].tag == 'test')):
+                test['tags'].append(elem.text)
+        elif elem.tag == 'status' and parent is not None and parent.tag == 'suite' and len(stack) == 2:
+            yield 'suite', _robot_elapsed(elem)
+        
+        if elem.tag == 'test':
+            test.setdefault('status', 'FAIL')
+            test.setdefault('passed', False)
+            test.setdefault('duration', 0)
+            test.setdefault('message', '')
+            yield 'test', test
+            test = None
+        if elem.tag in ('test', 'kw', 'suite') and parent is not None:
+            parent.remove(elem)
+
+
+# Jenkins builds are queued from these threads so API clients do not wait
+# on the Jenkins round-trip
+_JENKINS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='qa_jenkins')
+
+
+def _trigger_jenkins_build(dbname, run_id, jenkins, parameters):
+    """Queue a Jenkins build and record it on the run, in a transaction of its own"""
+    try:
+        build_number = jenkins.trigger_build(parameters=parameters)
+        vals = {'jenkins_build_number': build_number, 'state': 'running'}
+    except Exception as e:
+        _logger.error("Jenkins trigger error for run %s: %s", run_id, e)
+        vals = {'state': 'error'}
+    with Registry(dbname).cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        env['qa.test.run'].browse(run_id).write(vals)
+
 
 class QATestController(http.Controller):
     """Controller for QA Test Generator API endpoints"""
@@ -23,22 +344,20 @@ class QATestController(http.Controller):
         auth_header = request.httprequest.headers.get('Authorization', '')
         if auth_header.startswith('Bearer '):
             api_key = auth_header[7:]
-            config = request.env['qa.test.ai.config'].sudo().search([
-                ('api_key', '=', api_key),
-                ('active', '=', True)
-            ], limit=1)
-            return config.exists()
+            return bool(request.env['qa.test.ai.config'].sudo()._check_api_key(api_key))
         return False
 
+    def _serialize(self, payload, status=200):
+        """Build the HTTP response, as MessagePack if the client negotiated it"""
+        body, content_type = _encode_payload(payload, request.httprequest)
+        return Response(body, status=status, content_type=content_type)
+
     # ==================== Health Check ====================
     
     @http.route('/api/v1/qa/health', type='http', auth='public', methods=['GET'], csrf=False)
     def api_health(self, **kwargs):
         """Health check endpoint"""
-        return Response(
-            json.dumps({'status': 'ok', 'service': 'qa-test-generator'}),
-            content_type='application/json'
-        )
+        return self._serialize({'status': 'ok', 'service': 'qa-test-generator'})
 
     # ==================== Customer API ====================
     
@@ -51,37 +370,53 @@ class QATestController(http.Controller):
         Authorization: Bearer <api_key>
         """
         if not self._check_api_key():
-            return Response(json.dumps({'error': 'Unauthorized'}), status=401, content_type='application/json')
+            return self._serialize({'error': 'Unauthorized'}, status=401)
         
         try:
-            customers = request.env['qa.customer'].sudo().search([('active', '=', True)])
+            customers = request.env['qa.customer'].sudo().search_read(
+                [('active', '=', True)], ['name', 'code', 'odoo_version'],
+            )
+            customer_ids = [c['id'] for c in customers]
+            
+            # Servers and suites of all customers in one query each,
+            # bucketed by customer (in the one2many order)
+            servers_by_customer = {}
+            for s in request.env['qa.customer.server'].sudo().search_read(
+                    [('customer_id', 'in', customer_ids)], ['customer_id', 'name', 'environment', 'url']):
+                servers_by_customer.setdefault(s['customer_id'][0], []).append({
+                    'id': s['id'],
+                    'name': s['name'],
+                    'environment': s['environment'],
+                    'url': s['url'],
+                })
+            suites_by_customer = {}
+            for suite in request.env['qa.test.suite'].sudo().search_read(
+                    [('customer_id', 'in', customer_ids)], ['customer_id']):
+                suites_by_customer.setdefault(suite['customer_id'][0], []).append(suite['id'])
             
-            result = []
-            for customer in customers:
+            result = [None] * len(customers)
+            for i, customer in enumerate(customers):
+                servers = servers_by_customer.get(customer['id'], [])
+                suite_ids = suites_by_customer.get(customer['id'], [])
                 # Get staging server
-                staging_server = customer.server_ids.filtered(lambda s: s.environment == 'staging')[:1]
+                staging_url = next((s['url'] for s in servers if s['environment'] == 'staging'), None)
                 
-                result.append({
-                    'id': customer.id,
-                    'name': customer.name,
-                    'code': customer.code,
-                    'odoo_version': customer.odoo_version,
-                    'staging_url': staging_server.url if staging_server else None,
-                    'default_suite_id': customer.suite_ids[0].id if customer.suite_ids else None,
-                    'suite_ids': customer.suite_ids.ids,
-                    'server_ids': [{
-                        'id': s.id,
-                        'name': s.name,
-                        'environment': s.environment,
-                        'url': s.url,
-                    } for s in customer.server_ids],
-                })
+                result[i] = {
+                    'id': customer['id'],
+                    'name': customer['name'],
+                    'code': customer['code'],
+                    'odoo_version': customer['odoo_version'],
+                    'staging_url': staging_url,
+                    'default_suite_id': suite_ids[0] if suite_ids else None,
+                    'suite_ids': suite_ids,
+                    'server_ids': servers,
+                }
             
-            return Response(json.dumps(result), content_type='application/json')
+            return self._serialize(result)
             
         except Exception as e:
-            _logger.error(f"API error: {str(e)}")
-            return Response(json.dumps({'error': str(e)}), status=500, content_type='application/json')
+            _logger.error("API error: %s", e)
+            return self._serialize({'error': str(e)}, status=500)
 
     # ==================== Test Download API ====================
     
@@ -96,125 +431,79 @@ class QATestController(http.Controller):
         Returns: ZIP file containing Robot Framework tests
         """
         if not self._check_api_key():
-            return Response(json.dumps({'error': 'Unauthorized'}), status=401, content_type='application/json')
+            return self._serialize({'error': 'Unauthorized'}, status=401)
         
         try:
             suite = request.env['qa.test.suite'].sudo().browse(suite_id)
             if not suite.exists():
-                return Response(json.dumps({'error': 'Suite not found'}), status=404, content_type='application/json')
+                return self._serialize({'error': 'Suite not found'}, status=404)
             
-            # Create ZIP file in memory
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                
-                # Add each test case's robot code
-                for test_case in suite.test_case_ids:
-                    if test_case.robot_code:
-                        filename = f"tests/{test_case.test_id or f'test_{test_case.id}'}.robot"
-                        zip_file.writestr(filename, test_case.robot_code)
-                
-                # Add resource file with common keywords
-                resource_content = self._generate_resource_file(suite)
-                zip_file.writestr('tests/resources/common.resource', resource_content)
-                
-                # Add variables file
-                variables_content = self._generate_variables_file(suite)
-                zip_file.writestr('tests/resources/variables.py', variables_content)
-                
-                # Add requirements file
-                requirements = """robotframework>=6.0
-robotframework-seleniumlibrary>=6.0
-robotframework-requests>=0.9
-"""
-                zip_file.writestr('requirements.txt', requirements)
-            
-            zip_buffer.seek(0)
+            # Unchanged suites are served from the archive cache
+            variables = self._generate_variables_file(suite)
+            [(last_change, case_count)] = request.env['qa.test.case'].sudo()._read_group(
+                [('suite_id', '=', suite.id)], [], ['write_date:max', '__count'],
+            )
+            cache_key = (request.env.cr.dbname, suite.id, last_change, case_count, variables)
+            body = _ZIP_CACHE.get(cache_key)
+            if body is None:
+                spool = tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_MAX_SIZE, suffix='.zip')
+                _write_zip(spool, self._download_entries(suite, variables), stored=_STORED_MEMBERS)
+                size = spool.tell()
+                spool.seek(0)
+                if size <= _ZIP_CACHE_MAX_SIZE:
+                    _ZIP_CACHE[cache_key] = spool.read()
+                    spool.seek(0)
+                # The WSGI server reads the spool directly, closing it when done
+                body = wrap_file(request.httprequest.environ, spool)
+            else:
+                size = len(body)
             
             return Response(
-                zip_buffer.getvalue(),
+                body,
                 headers={
                     'Content-Type': 'application/zip',
-                    'Content-Disposition': f'attachment; filename=tests_{suite_id}.zip'
-                }
+                    'Content-Disposition': f'attachment; filename=tests_{suite_id}.zip',
+                    'Content-Length': str(size),
+                },
+                direct_passthrough=True,
             )
             
         except Exception as e:
-            _logger.error(f"Download error: {str(e)}")
-            return Response(json.dumps({'error': str(e)}), status=500, content_type='application/json')
+            _logger.error("Download error: %s", e)
+            return self._serialize({'error': str(e)}, status=500)
+    
+    def _download_entries(self, suite, variables):
+        """Archive members of a suite download, as (filename, content)"""
+        # Members are read with one query for all the test cases
+        entries = []
+        for row in suite.test_case_ids.read(['test_id', 'robot_code']):
+            if row['robot_code']:
+                filename = f"tests/{row['test_id'] or 'test_%d' % row['id']}.robot"
+                entries.append((filename, row['robot_code']))
+        
+        # Add resource file with common keywords
+        entries.append(('tests/resources/common.resource', self._generate_resource_file(suite)))
+        
+        # Add variables file
+        entries.append(('tests/resources/variables.py', variables))
+        
+        # Add requirements file
+        requirements = """robotframework>=6.0
+robotframework-seleniumlibrary>=6.0
+robotframework-requests>=0.9
+"""
+        entries.append(('requirements.txt', requirements))
+        return entries
     
     def _generate_resource_file(self, suite):
         """Generate common resource file"""
-        return """*** Settings ***
-Library    SeleniumLibrary
-Library    Collections
-Library    String
-Library    DateTime
-
-*** Keywords ***
-Login To Odoo
-    [Arguments]    ${username}    ${password}    ${url}=${SERVER_URL}
-    Open Browser    ${url}/web/login    ${BROWSER}    options=${BROWSER_OPTIONS}
-    Maximize Browser Window
-    Input Text    login    ${username}
-    Input Text    password    ${password}
-    Click Button    xpath=//button[@type='submit']
-    Wait Until Page Contains Element    xpath=//a[contains(@class, 'o_menu_toggle')]    timeout=30s
-
-Logout From Odoo
-    Click Element    xpath=//a[contains(@class, 'o_user_menu')]
-    Click Link    xpath=//a[@data-menu='logout']
-
-Navigate To
-    [Arguments]    @{menu_path}
-    FOR    ${menu}    IN    @{menu_path}
-        Click Link    xpath=//a[contains(@class, 'o_menu_entry_lvl_') and contains(text(), '${menu}')]
-        Sleep    0.5s
-    END
-    Wait Until Page Contains Element    xpath=//div[contains(@class, 'o_content')]    timeout=30s
-
-Click Button With Text
-    [Arguments]    ${text}
-    Click Button    xpath=//button[contains(text(), '${text}') or contains(., '${text}')]
-
-Fill Field
-    [Arguments]    ${field_name}    ${value}
-    Input Text    xpath=//input[@name='${field_name}'] | //textarea[@name='${field_name}']    ${value}
-
-Select Dropdown Value
-    [Arguments]    ${field_name}    ${value}
-    Click Element    xpath=//div[@name='${field_name}']//input
-    Wait Until Element Is Visible    xpath=//ul[contains(@class, 'ui-autocomplete')]
-    Click Element    xpath=//li[contains(text(), '${value}')]
-
-Verify Field Value
-    [Arguments]    ${field_name}    ${expected_value}
-    ${actual}=    Get Value    xpath=//input[@name='${field_name}']
-    Should Be Equal    ${actual}    ${expected_value}
-
-Take Screenshot On Failure
-    [Teardown]    Run Keyword If Test Failed    Capture Page Screenshot
-"""
+        return _RESOURCE_FILE_BYTES
     
     def _generate_variables_file(self, suite):
         """Generate variables file"""
         config = request.env['qa.test.ai.config'].sudo().search([], limit=1)
         base_url = config.test_base_url if config else 'http://localhost:8069'
-        
-        return f"""# -*- coding: utf-8 -*-
-# Generated by QA Test Generator
-
-SERVER_URL = '{base_url}'
-BROWSER = 'chrome'
-BROWSER_OPTIONS = 'add_argument("--headless"); add_argument("--no-sandbox"); add_argument("--disable-dev-shm-usage")'
-
-# Test credentials (override via command line)
-TEST_USER = 'admin'
-TEST_PASSWORD = 'admin'
-
-# Timeouts
-IMPLICIT_WAIT = 10
-PAGE_LOAD_TIMEOUT = 30
-"""
+        return _variables_file_bytes(base_url)
 
     # ==================== Results Upload API ====================
     
@@ -234,16 +523,16 @@ PAGE_LOAD_TIMEOUT = 30
             report_html: Robot Framework report.html file (optional)
         """
         if not self._check_api_key():
-            return Response(json.dumps({'error': 'Unauthorized'}), status=401, content_type='application/json')
+            return self._serialize({'error': 'Unauthorized'}, status=401)
         
         try:
             run_id = int(request.params.get('run_id', 0))
             if not run_id:
-                return Response(json.dumps({'error': 'run_id is required'}), status=400, content_type='application/json')
+                return self._serialize({'error': 'run_id is required'}, status=400)
             
             run = request.env['qa.test.run'].sudo().browse(run_id)
             if not run.exists():
-                return Response(json.dumps({'error': 'Run not found'}), status=404, content_type='application/json')
+                return self._serialize({'error': 'Run not found'}, status=404)
             
             # Get uploaded files
             output_xml = request.httprequest.files.get('output_xml')
@@ -251,119 +540,98 @@ PAGE_LOAD_TIMEOUT = 30
             report_html = request.httprequest.files.get('report_html')
             
             if not output_xml:
-                return Response(json.dumps({'error': 'output_xml is required'}), status=400, content_type='application/json')
-            
-            # Save output.xml temporarily and parse
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as tmp:
-                tmp.write(output_xml.read())
-                tmp_path = tmp.name
+                return self._serialize({'error': 'output_xml is required'}, status=400)
             
-            try:
-                # Parse Robot Framework results
-                results = self._parse_robot_results(tmp_path)
+            # Buffer output.xml in memory, spilling to disk only for large files
+            with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024, suffix='.xml') as spool:
+                shutil.copyfileobj(output_xml.stream, spool, length=1024 * 1024)
+                spool.seek(0)
                 
-                # Update run
-                run.write({
-                    'state': 'passed' if results['failed'] == 0 else 'failed',
-                    'total_tests': results['total'],
-                    'passed_tests': results['passed'],
-                    'failed_tests': results['failed'],
-                    'pass_rate': results['pass_rate'],
-                    'end_time': results.get('end_time'),
-                    'duration': results.get('duration', 0),
+                # Parse Robot Framework results
+                results = self._parse_robot_results(spool)
+            
+            # Update run
+            run.write({
+                'state': 'passed' if results['failed'] == 0 else 'failed',
+                'total_tests': results['total'],
+                'passed_tests': results['passed'],
+                'failed_tests': results['failed'],
+                'pass_rate': results['pass_rate'],
+                'end_time': results.get('end_time'),
+                'duration': results.get('duration', 0),
+            })
+            
+            # Create individual test results, resolving test cases in one query
+            tests = results.get('tests', [])
+            domain = [('name', 'in', list({t['name'] for t in tests}))]
+            if run.suite_id:
+                domain.append(('suite_id', '=', run.suite_id.id))
+            name_to_id = {}
+            for case in request.env['qa.test.case'].sudo().search_read(domain, ['name']):
+                name_to_id.setdefault(case['name'], case['id'])
+            
+            vals_list = [{
+                'run_id': run.id,
+                'test_case_id': name_to_id[t['name']],
+                'status': 'passed' if t['passed'] else 'failed',
+                'duration': t.get('duration', 0),
+                'message': t.get('message', ''),
+            } for t in tests if t['name'] in name_to_id]
+            if vals_list:
+                request.env['qa.test.result'].sudo().create(vals_list)
+            
+            # Store attachments
+            if log_html:
+                request.env['ir.attachment'].sudo().create({
+                    'name': f'log_{run.id}.html',
+                    'raw': log_html.read(),
+                    'res_model': 'qa.test.run',
+                    'res_id': run.id,
                 })
-                
-                # Create individual test results
-                for test_result in results.get('tests', []):
-                    # Find matching test case
-                    test_case = request.env['qa.test.case'].sudo().search([
-                        ('name', 'ilike', test_result['name'])
-                    ], limit=1)
-                    
-                    request.env['qa.test.result'].sudo().create({
-                        'run_id': run.id,
-                        'test_case_id': test_case.id if test_case else False,
-                        'status': 'passed' if test_result['passed'] else 'failed',
-                        'duration': test_result.get('duration', 0),
-                        'message': test_result.get('message', ''),
-                    })
-                
-                # Store attachments
-                if log_html:
-                    request.env['ir.attachment'].sudo().create({
-                        'name': f'log_{run.id}.html',
-                        'datas': base64.b64encode(log_html.read()),
-                        'res_model': 'qa.test.run',
-                        'res_id': run.id,
-                    })
-                
-                if report_html:
-                    request.env['ir.attachment'].sudo().create({
-                        'name': f'report_{run.id}.html',
-                        'datas': base64.b64encode(report_html.read()),
-                        'res_model': 'qa.test.run',
-                        'res_id': run.id,
-                    })
-                
-            finally:
-                os.unlink(tmp_path)
             
-            return Response(json.dumps({
+            if report_html:
+                request.env['ir.attachment'].sudo().create({
+                    'name': f'report_{run.id}.html',
+                    'raw': report_html.read(),
+                    'res_model': 'qa.test.run',
+                    'res_id': run.id,
+                })
+            
+            return self._serialize({
                 'success': True,
                 'run_id': run.id,
                 'state': run.state,
                 'pass_rate': run.pass_rate,
-            }), content_type='application/json')
+            })
             
         except Exception as e:
-            _logger.error(f"Upload error: {str(e)}")
-            return Response(json.dumps({'error': str(e)}), status=500, content_type='application/json')
+            _logger.error("Upload error: %s", e)
+            return self._serialize({'error': str(e)}, status=500)
     
-    def _parse_robot_results(self, xml_path):
-        """Parse Robot Framework output.xml"""
-        try:
-            from robot.api import ExecutionResult
-            
-            result = ExecutionResult(xml_path)
-            stats = result.statistics.total
-            
-            tests = []
-            for test in result.suite.all_tests:
-                tests.append({
-                    'name': test.name,
-                    'passed': test.passed,
-                    'duration': test.elapsedtime / 1000,  # Convert to seconds
-                    'message': test.message if not test.passed else '',
-                    'tags': list(test.tags),
-                })
-            
-            return {
-                'total': stats.total,
-                'passed': stats.passed,
-                'failed': stats.failed,
-                'pass_rate': (stats.passed / stats.total * 100) if stats.total > 0 else 0,
-                'duration': result.suite.elapsedtime / 1000,
-                'tests': tests,
-            }
-            
-        except ImportError:
-            # Fallback: parse XML manually
-            import xml.etree.ElementTree as ET
-            
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
-            
-            total = int(root.find('.//stat[@name="All Tests"]').text or 0)
-            passed = int(root.find('.//stat[@name="All Tests"]').get('pass', 0))
-            failed = int(root.find('.//stat[@name="All Tests"]').get('fail', 0))
-            
-            return {
-                'total': total,
-                'passed': passed,
-                'failed': failed,
-                'pass_rate': (passed / total * 100) if total > 0 else 0,
-                'tests': [],
-            }
+    def _parse_robot_results(self, source):
+        """Parse Robot Framework output.xml, one <test> element at a time"""
+        tests = []
+        passed = failed = 0
+        duration = 0
+        for kind, value in _iter_robot_output(source):
+            if kind == 'suite':
+                duration = value
+                continue
+            tests.append(value)
+            if value['passed']:
+                passed += 1
+            elif value['status'] == 'FAIL':
+                failed += 1
+        
+        total = len(tests)
+        return {
+            'total': total,
+            'passed': passed,
+            'failed': failed,
+            'pass_rate': (passed / total * 100) if total > 0 else 0,
+            'duration': duration,
+            'tests': tests,
+        }
 
     # ==================== Trigger API ====================
     
@@ -384,18 +652,20 @@ PAGE_LOAD_TIMEOUT = 30
         }
         """
         if not self._check_api_key():
-            return Response(json.dumps({'error': 'Unauthorized'}), status=401, content_type='application/json')
+            return self._serialize({'error': 'Unauthorized'}, status=401)
         
         try:
             suite = request.env['qa.test.suite'].sudo().browse(suite_id)
             if not suite.exists():
-                return Response(json.dumps({'error': 'Suite not found'}), status=404, content_type='application/json')
+                return self._serialize({'error': 'Suite not found'}, status=404)
             
             # Parse JSON body
             try:
-                body = json.loads(request.httprequest.data.decode('utf-8'))
-            except:
-                body = {}
+                body = json_loads(request.httprequest.get_data() or b'{}')
+            except ValueError as e:
+                return self._serialize({'error': f'Invalid JSON body: {e}'}, status=400)
+            if not isinstance(body, dict):
+                return self._serialize({'error': 'JSON body must be an object'}, status=400)
             
             server_id = body.get('server_id')
             use_jenkins = body.get('jenkins', True)
@@ -409,7 +679,8 @@ PAGE_LOAD_TIMEOUT = 30
                 'triggered_by': 'api',
             })
             
-            # Trigger Jenkins if configured
+            # Trigger Jenkins if configured, once the run is committed
+            jenkins_queued = False
             if use_jenkins:
                 config = request.env['qa.test.ai.config'].sudo().search([
                     ('jenkins_enabled', '=', True)
@@ -425,29 +696,30 @@ PAGE_LOAD_TIMEOUT = 30
                         server = request.env['qa.customer.server'].sudo().browse(server_id)
                         server_url = server.url if server.exists() else server_url
                     
-                    build_number = jenkins.trigger_build(parameters={
+                    parameters = {
                         'SUITE_ID': str(suite_id),
                         'RUN_ID': str(run.id),
                         'SERVER_URL': server_url,
                         'CALLBACK_URL': request.httprequest.host_url.rstrip('/'),
-                    })
-                    
-                    run.write({
-                        'jenkins_build_number': build_number,
-                        'state': 'running',
-                    })
+                    }
+                    request.env.cr.postcommit.add(functools.partial(
+                        _JENKINS_EXECUTOR.submit, _trigger_jenkins_build,
+                        request.env.cr.dbname, run.id, jenkins, parameters,
+                    ))
+                    jenkins_queued = True
             
-            return Response(json.dumps({
+            return self._serialize({
                 'success': True,
                 'run_id': run.id,
                 'suite_id': suite.id,
                 'state': run.state,
-                'jenkins_build': run.jenkins_build_number if use_jenkins else None,
-            }), content_type='application/json')
+                'jenkins_build': None,
+                'jenkins': 'queued' if jenkins_queued else None,
+            }, status=202 if jenkins_queued else 200)
             
         except Exception as e:
-            _logger.error(f"Trigger error: {str(e)}")
-            return Response(json.dumps({'error': str(e)}), status=500, content_type='application/json')
+            _logger.error("Trigger error: %s", e)
+            return self._serialize({'error': str(e)}, status=500)
 
     # ==================== Status API ====================
     
@@ -460,14 +732,14 @@ PAGE_LOAD_TIMEOUT = 30
         Authorization: Bearer <api_key>
         """
         if not self._check_api_key():
-            return Response(json.dumps({'error': 'Unauthorized'}), status=401, content_type='application/json')
+            return self._serialize({'error': 'Unauthorized'}, status=401)
         
         try:
             run = request.env['qa.test.run'].sudo().browse(run_id)
             if not run.exists():
-                return Response(json.dumps({'error': 'Run not found'}), status=404, content_type='application/json')
+                return self._serialize({'error': 'Run not found'}, status=404)
             
-            return Response(json.dumps({
+            return self._serialize({
                 'run_id': run.id,
                 'name': run.name,
                 'state': run.state,
@@ -479,11 +751,11 @@ PAGE_LOAD_TIMEOUT = 30
                 'start_time': run.start_time.isoformat() if run.start_time else None,
                 'end_time': run.end_time.isoformat() if run.end_time else None,
                 'jenkins_build': run.jenkins_build_number,
-            }), content_type='application/json')
+            })
             
         except Exception as e:
-            _logger.error(f"Status error: {str(e)}")
-            return Response(json.dumps({'error': str(e)}), status=500, content_type='application/json')
+            _logger.error("Status error: %s", e)
+            return self._serialize({'error': str(e)}, status=500)
 
     # ==================== Legacy Endpoints (for backward compatibility) ====================
 
@@ -491,10 +763,9 @@ PAGE_LOAD_TIMEOUT = 30
     def api_create_run(self, **kwargs):
         """Legacy: API endpoint to create and execute a test run"""
         try:
-            suite_id = kwargs.get('suite_id')
-            test_case_ids = kwargs.get('test_case_ids', [])
-            environment = kwargs.get('environment', 'local')
-            auto_execute = kwargs.get('auto_execute', False)
+            params = _parse_run_request(kwargs)
+            suite_id = params.suite_id
+            test_case_ids = params.test_case_ids
             
             # Get test cases
             if suite_id:
@@ -506,14 +777,14 @@ PAGE_LOAD_TIMEOUT = 30
             
             # Create run
             run = request.env['qa.test.run'].create({
-                'name': kwargs.get('name', 'API Run'),
+                'name': params.name,
                 'suite_id': suite_id,
                 'test_case_ids': [(6, 0, test_case_ids)],
-                'environment': environment,
+                'environment': params.environment,
                 'triggered_by': 'api',
             })
             
-            if auto_execute:
+            if params.auto_execute:
                 run.action_execute()
             
             return {
@@ -523,58 +794,76 @@ PAGE_LOAD_TIMEOUT = 30
             }
             
         except Exception as e:
-            _logger.error(f"API error: {str(e)}")
+            _logger.error("API error: %s", e)
             return {'error': str(e)}
 
     @http.route('/qa_test/api/run/<int:run_id>/status', type='json', auth='user', methods=['GET'])
     def api_get_run_status(self, run_id, **kwargs):
         """Get status of a test run"""
-        try:
-            run = request.env['qa.test.run'].browse(run_id)
-            if not run.exists():
-                return {'error': 'Run not found'}
-            
-            return {
-                'run_id': run.id,
-                'name': run.name,
-                'state': run.state,
-                'total_tests': run.total_tests,
-                'passed_tests': run.passed_tests,
-                'failed_tests': run.failed_tests,
-                'pass_rate': run.pass_rate,
-                'duration': run.duration,
-            }
-            
-        except Exception as e:
-            _logger.error(f"API error: {str(e)}")
-            return {'error': str(e)}
+        run = request.env['qa.test.run'].browse(run_id)
+        if not run.exists():
+            raise UserError(_('Run not found'))
+        
+        return {
+            'run_id': run.id,
+            'name': run.name,
+            'state': run.state,
+            'total_tests': run.total_tests,
+            'passed_tests': run.passed_tests,
+            'failed_tests': run.failed_tests,
+            'pass_rate': run.pass_rate,
+            'duration': run.duration,
+        }
 
     @http.route('/qa_test/api/run/<int:run_id>/results', type='json', auth='user', methods=['GET'])
     def api_get_run_results(self, run_id, **kwargs):
         """Get detailed results of a test run"""
-        try:
-            run = request.env['qa.test.run'].browse(run_id)
-            if not run.exists():
-                return {'error': 'Run not found'}
-            
-            results = []
-            for result in run.result_ids:
-                results.append({
-                    'test_case_id': result.test_case_id.id,
-                    'test_name': result.test_case_id.name,
-                    'status': result.status,
-                    'duration': result.duration,
-                    'message': result.message,
-                })
-            
-            return {
-                'run_id': run.id,
-                'results': results,
-            }
-            
-        except Exception as e:
-            _logger.error(f"API error: {str(e)}")
-            return {'error': str(e)}
+        run = request.env['qa.test.run'].browse(run_id)
+        if not run.exists():
+            raise UserError(_('Run not found'))
+        
+        # One read for all rows; test_case_id comes back as (id, name)
+        rows = run.result_ids.read(_RESULT_FIELDS)
+        results = [self._result_row(r) for r in rows]
+
+        return {
+            'run_id': run.id,
+            'results': results,
+        }
+
+    @http.route('/qa_test/api/run/<int:run_id>/results.ndjson', type='http', auth='user', methods=['GET'])
+    def api_stream_run_results(self, run_id, **kwargs):
+        """
+        Stream the results of a test run as newline-delimited JSON
+        
+        GET /qa_test/api/run/<run_id>/results.ndjson
+        
+        Returns one JSON object per line, same fields as /results
+        """
+        run = request.env['qa.test.run'].browse(run_id)
+        if not run.exists():
+            return request.not_found()
+        
+        # Rows are read while the request cursor is open; only the encoding
+        # happens lazily, as the client consumes the body.
+        rows = run.result_ids.read(_RESULT_FIELDS)
+        
+        def generate():
+            for r in rows:
+                yield json_dumps(self._result_row(r)) + b'\n'
+        
+        return Response(generate(), content_type='application/x-ndjson', direct_passthrough=True)
+
+    @staticmethod
+    def _result_row(r):
+        """Map a read() row of qa.test.result to its API representation"""
+        return {
+            'test_case_id': r['test_case_id'] and r['test_case_id'][0],
+            'test_name': r['test_case_id'] and r['test_case_id'][1],
+            'status': r['status'],
+            'duration': r['duration'],
+            'message': r['message'],
+        }
 
     @http.route('/qa_test/api/generate', type='json', auth='user', methods=['POST'])
     def api_generate_tests(self, **kwargs):
@@ -611,7 +900,7 @@ PAGE_LOAD_TIMEOUT = 30
             }
             
         except Exception as e:
-            _logger.error(f"API error: {str(e)}")
+            _logger.error("API error: %s", e)
             return {'error': str(e)}
 
     @http.route('/qa_test/webhook/jenkins', type='json', auth='public', methods=['POST'], csrf=False)
@@ -626,103 +915,151 @@ PAGE_LOAD_TIMEOUT = 30
             "status": "SUCCESS",
             "results": [...]
         }
+        
+        Several builds can be reported at once:
+        {
+            "runs": [{"run_id": 1, "build_number": 123, "status": "SUCCESS", "results": [...]}, ...]
+        }
         """
         try:
-            run_id = kwargs.get('run_id')
-            status = kwargs.get('status')
+            runs = kwargs.get('runs')
+            if isinstance(runs, list):
+                return {'success': True, 'queued': True, 'runs': self._queue_jenkins_results(runs)}
             
-            if not run_id:
+            if not kwargs.get('run_id'):
                 return {'error': 'run_id is required'}
             
-            run = request.env['qa.test.run'].sudo().browse(int(run_id))
-            if not run.exists():
-                return {'error': 'Run not found'}
-            
-            # Map Jenkins status to our status
-            status_map = {
-                'SUCCESS': 'passed',
-                'FAILURE': 'failed',
-                'UNSTABLE': 'failed',
-                'ABORTED': 'cancelled',
-            }
-            
-            run.write({
-                'state': status_map.get(status, 'error'),
-                'jenkins_build_number': kwargs.get('build_number'),
-            })
-            
-            # Process results if provided
-            results = kwargs.get('results', [])
-            for result_data in results:
-                test_case = request.env['qa.test.case'].sudo().search([
-                    ('test_id', '=', result_data.get('test_id'))
-                ], limit=1)
-                
-                if test_case:
-                    request.env['qa.test.result'].sudo().create({
-                        'test_case_id': test_case.id,
-                        'run_id': run.id,
-                        'status': result_data.get('status', 'error'),
-                        'duration': result_data.get('duration', 0),
-                        'message': result_data.get('message', ''),
-                    })
-            
-            return {'success': True}
+            status, = self._queue_jenkins_results([kwargs]).values()
+            if status != 'queued':
+                return {'error': status}
+            return {'success': True, 'queued': True}
             
         except Exception as e:
-            _logger.error(f"Webhook error: {str(e)}")
+            _logger.error("Webhook error: %s", e)
             return {'error': str(e)}
 
-    @http.route('/qa_test/dashboard/data', type='json', auth='user', methods=['GET'])
+    def _queue_jenkins_results(self, entries):
+        """
+        Store Jenkins build reports in the results inbox
+        
+        Returns a {run_id: 'queued' or error message} map
+        """
+        statuses = {}
+        valid = []
+        for entry in entries:
+            run_id = entry.get('run_id')
+            if not run_id:
+                statuses[str(run_id)] = 'run_id is required'
+                continue
+            try:
+                valid.append((int(run_id), entry))
+            except (TypeError, ValueError):
+                statuses[str(run_id)] = 'Invalid run_id'
+        
+        existing = set(request.env['qa.test.run'].sudo().browse([r for r, _e in valid]).exists().ids)
+        vals_list = []
+        for run_id, entry in valid:
+            if run_id not in existing:
+                statuses[str(run_id)] = 'Run not found'
+                continue
+            # Apply the results in the background so Jenkins is not kept
+            # waiting on the inserts
+            vals_list.append({
+                'run_id': run_id,
+                'build_number': entry.get('build_number'),
+                'jenkins_status': entry.get('status'),
+                'payload': json_dumps(entry.get('results') or []).decode(),
+            })
+            statuses[str(run_id)] = 'queued'
+        
+        if vals_list:
+            request.env['qa.test.result.inbox'].sudo().create(vals_list)
+            request.env.ref('qa_test_generator.ir_cron_process_result_inbox').sudo()._trigger()
+        return statuses
+
+    @http.route('/qa_test/dashboard/data', type='http', auth='user', methods=['GET'])
     def get_dashboard_data(self, **kwargs):
-        """Get data for dashboard"""
-        try:
-            TestSpec = request.env['qa.test.spec']
-            TestCase = request.env['qa.test.case']
-            TestRun = request.env['qa.test.run']
-            TestResult = request.env['qa.test.result']
-            
-            # Summary stats
-            total_specs = TestSpec.search_count([])
-            total_tests = TestCase.search_count([])
-            ready_tests = TestCase.search_count([('state', '=', 'ready')])
-            
-            # Pass rate from recent results
-            recent_results = TestResult.search([], limit=100, order='execution_date desc')
-            if recent_results:
-                passed = len(recent_results.filtered(lambda r: r.status == 'passed'))
-                pass_rate = (passed / len(recent_results)) * 100
-            else:
-                pass_rate = 0
-            
-            # Recent runs
-            recent_runs = TestRun.search([], limit=5, order='start_time desc')
-            runs_data = [{
-                'id': r.id,
-                'name': r.name,
-                'date': r.start_time.isoformat() if r.start_time else '',
-                'state': r.state,
-                'pass_rate': r.pass_rate,
-            } for r in recent_runs]
-            
-            # Failed tests
-            failed_tests = TestCase.search([('state', 'in', ['failed', 'error'])], limit=10)
-            failed_data = [{
-                'id': t.id,
-                'name': t.name,
-                'last_run': t.last_run_date.isoformat() if t.last_run_date else '',
-                'error': (t.last_error_message or '')[:100],
-            } for t in failed_tests]
-            
-            return {
-                'total_specs': total_specs,
-                'total_tests': total_tests,
-                'pending_tests': ready_tests,
-                'pass_rate': round(pass_rate, 1),
-                'recent_runs': runs_data,
-                'failed_tests': failed_data,
-            }
-            
-        except Exception as e:
-            _logger.error(f"Dashboard error: {str(e)}")
-            return {'error': str(e)}
+        """
+        Get data for dashboard
+        
+        The response carries an ETag derived from the dashboard figures;
+        clients sending it back in If-None-Match get a 304.
+        """
+        cache_key = (request.env.cr.dbname, request.env.uid, request.env.company.id)
+        cached = _DASHBOARD_CACHE.get(cache_key)
+        now = time.monotonic()
+        if cached and now - cached[0] < _DASHBOARD_CACHE_TTL:
+            etag, payload = cached[1], cached[2]
+        else:
+            payload = self._dashboard_payload()
+            etag = self._dashboard_etag(payload)
+            _DASHBOARD_CACHE[cache_key] = (now, etag, payload)
+        
+        if etag in request.httprequest.if_none_match:
+            response = Response(status=304)
+        else:
+            response = self._serialize(payload)
+        response.set_etag(etag)
+        return response
+
+    def _dashboard_etag(self, payload):
+        """Version token of the dashboard data: digest of the figures served to this user and company"""
+        token = f"{request.env.uid}:{request.env.company.id}:".encode() + json_dumps(payload)
+        return hashlib.blake2b(token, digest_size=16).hexdigest()
+
+    def _dashboard_payload(self):
+        """Compute the dashboard figures for the current user"""
+        TestSpec = request.env['qa.test.spec']
+        TestCase = request.env['qa.test.case']
+        TestRun = request.env['qa.test.run']
+        TestResult = request.env['qa.test.result']
+        
+        # Summary stats, test case counters come from a single GROUP BY state
+        total_specs = TestSpec.search_count([])
+        case_counts = dict(TestCase._read_group([], ['state'], ['__count']))
+        total_tests = sum(case_counts.values())
+        ready_tests = case_counts.get('ready', 0)
+        
+        # Pass rate from the last 100 results, counted by Postgres: the
+        # _search query is inlined as a sub-select of the GROUP BY
+        TestResult.check_access('read')
+        recent_results = TestResult._search([], order='execution_date desc', limit=100)
+        counts = dict(TestResult._read_group(
+            [('id', 'in', recent_results)], ['status'], ['__count'],
+        ))
+        pass_rate = counts.get('passed', 0) * 100.0 / max(sum(counts.values()), 1)
+        
+        # Recent runs
+        recent_runs = TestRun.search_read(
+            [], ['name', 'start_time', 'state', 'pass_rate'],
+            limit=5, order='start_time desc',
+        )
+        runs_data = [{
+            'id': r['id'],
+            'name': r['name'],
+            'date': r['start_time'].isoformat() if r['start_time'] else '',
+            'state': r['state'],
+            'pass_rate': r['pass_rate'],
+        } for r in recent_runs]
+        
+        # Failed tests
+        failed_tests = TestCase.search_read(
+            [('state', 'in', ['failed', 'error'])],
+            ['name', 'last_run_date', 'last_error_message'],
+            limit=10,
+        )
+        failed_data = [{
+            'id': t['id'],
+            'name': t['name'],
+            'last_run': t['last_run_date'].isoformat() if t['last_run_date'] else '',
+            'error': (t['last_error_message'] or '')[:100],
+        } for t in failed_tests]
+        
+        return {
+            'total_specs': total_specs,
+            'total_tests': total_tests,
+            'pending_tests': ready_tests,
+            'pass_rate': round(pass_rate, 1),
+            'recent_runs': runs_data,
+            'failed_tests': failed_data,
+        }
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
+import hashlib
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -84,14 +85,52 @@ class QATestAIConfig(models.Model):
          'Max tokens must be positive'),
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    def _check_api_key(self, api_key):
+        """Check whether api_key belongs to an active configuration"""
+        return self._api_key_digest(api_key) in self._active_api_key_digests()
+
+    @api.model
+    def _api_key_digest(self, api_key):
+        return hashlib.blake2b(api_key.encode(), digest_size=32).digest()
+
+    @tools.ormcache()
+    def _active_api_key_digests(self):
+        configs = self.sudo().search_read([('active', '=', True)], ['api_key'])
+        return frozenset(self._api_key_digest(c['api_key']) for c in configs if c['api_key'])
+
     @api.model
     def get_active_config(self):
         """Get the active AI configuration"""
-        config = self.search([('active', '=', True)], limit=1)
+        config = self.browse(self._active_config_id())
         if not config:
             raise ValidationError('No active AI configuration found. Please configure AI settings.')
         return config
 
+    @tools.ormcache('self.env.company.id')
+    def _active_config_id(self):
+        config = self.sudo().search([
+            ('active', '=', True),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], limit=1)
+        return config.id or False
+
     def test_ai_connection(self):
         """Test connection to AI provider"""
         self.ensure_one()
@@ -171,7 +210,7 @@ class QATestAIConfig(models.Model):
         import os
         paths = [self.output_path, self.report_path]
         for path in paths:
-            if path and not os.path.exists(path):
+            if path:
                 os.makedirs(path, exist_ok=True)
         return {
             'type': 'ir.actions.client',
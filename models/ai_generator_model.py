@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, api
+from odoo.tools.lru import LRU
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# AIGenerator instances by (db, config id, config write_date), reused so that
+# successive AI calls share one HTTP session
+_GENERATOR_CACHE = LRU(8)
+
 
 class QAAIGenerator(models.AbstractModel):
     """Abstract model wrapper for AI Generator service"""
@@ -14,9 +19,8 @@ class QAAIGenerator(models.AbstractModel):
     @api.model
     def _get_ai_config(self):
         """Get active AI configuration"""
-        return self.env['qa.test.ai.config'].search([
-            ('active', '=', True)
-        ], limit=1)
+        AIConfig = self.env['qa.test.ai.config']
+        return AIConfig.browse(AIConfig._active_config_id())
 
     @api.model
     def _get_generator(self):
@@ -27,7 +31,11 @@ class QAAIGenerator(models.AbstractModel):
         if not config:
             raise Exception("No AI configuration found. Please configure AI settings first.")
         
-        return AIGenerator(config)
+        key = (self.env.cr.dbname, config.id, config.write_date)
+        generator = _GENERATOR_CACHE.get(key)
+        if generator is None:
+            generator = _GENERATOR_CACHE[key] = AIGenerator(config)
+        return generator
 
     @api.model
     def generate_test_scenarios_from_code(self, model_analysis,
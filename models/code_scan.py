@@ -2,12 +2,43 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+import atexit
 import logging
 import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from types import SimpleNamespace
 
 _logger = logging.getLogger(__name__)
 
+# Concurrent AI requests while generating the tests of a scan
+_AI_MAX_WORKERS = 8
+
+# Latest clone of each scan, (path, commit hash) by (db, scan id), so that
+# the analysis following a scan reuses its checkout. Clones are removed once
+# analyzed, on errors, when evicted and when the process exits.
+_CHECKOUTS_MAX = 16
+_CHECKOUTS = OrderedDict()
+_CHECKOUTS_LOCK = threading.Lock()
+
+
+def _remove_checkouts(paths):
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@atexit.register
+def _remove_all_checkouts():
+    with _CHECKOUTS_LOCK:
+        paths = [path for path, _commit_hash in _CHECKOUTS.values()]
+        _CHECKOUTS.clear()
+    _remove_checkouts(paths)
+
 
 class QACodeScan(models.Model):
     _name = 'qa.code.scan'
@@ -39,12 +70,12 @@ class QACodeScan(models.Model):
     
     # Discovered modules
     module_ids = fields.One2many('qa.scanned.module', 'scan_id', string='Modules')
-    module_count = fields.Integer(compute='_compute_counts')
-    selected_module_count = fields.Integer(compute='_compute_counts')
+    module_count = fields.Integer(compute='_compute_module_counts')
+    selected_module_count = fields.Integer(compute='_compute_module_counts')
     
     # Generated tests
     test_suite_ids = fields.One2many('qa.test.suite', 'code_scan_id', string='Test Suites')
-    test_count = fields.Integer(compute='_compute_counts')
+    test_count = fields.Integer(compute='_compute_test_count')
     
     # Logs
     scan_log = fields.Text(string='Scan Log', readonly=True)
@@ -57,20 +88,56 @@ class QACodeScan(models.Model):
     include_security_tests = fields.Boolean(string='Include Security Tests', default=True)
     include_negative_tests = fields.Boolean(string='Include Negative Tests', default=True)
     max_tests_per_model = fields.Integer(string='Max Tests per Model', default=25)
+    
+    # Background execution
+    full_run_queued = fields.Boolean(string='Full Run Queued', readonly=True, copy=False)
 
-    @api.depends('module_ids', 'module_ids.selected', 'test_suite_ids', 'test_suite_ids.test_case_ids')
-    def _compute_counts(self):
+    @api.depends('module_ids', 'module_ids.selected')
+    def _compute_module_counts(self):
+        scan_ids = self._origin.ids
+        module_counts = {}
+        selected_counts = {}
+        if scan_ids:
+            for scan, selected, count in self.env['qa.scanned.module']._read_group(
+                    [('scan_id', 'in', scan_ids)], ['scan_id', 'selected'], ['__count']):
+                module_counts[scan.id] = module_counts.get(scan.id, 0) + count
+                if selected:
+                    selected_counts[scan.id] = count
+        
         for record in self:
-            record.module_count = len(record.module_ids)
-            record.selected_module_count = len(record.module_ids.filtered('selected'))
-            record.test_count = sum(len(suite.test_case_ids) for suite in record.test_suite_ids)
+            record.module_count = module_counts.get(record._origin.id, 0)
+            record.selected_module_count = selected_counts.get(record._origin.id, 0)
 
-    @api.model
-    def create(self, vals):
-        if not vals.get('name'):
-            customer = self.env['qa.customer'].browse(vals.get('customer_id'))
-            vals['name'] = f"Scan - {customer.code} - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        return super().create(vals)
+    @api.depends('test_suite_ids', 'test_suite_ids.test_case_ids')
+    def _compute_test_count(self):
+        scan_ids = self._origin.ids
+        test_counts = {}
+        if scan_ids:
+            # Test cases of the scan suites, counted in one aggregate query
+            self.env['qa.test.suite'].flush_model(['code_scan_id', 'active'])
+            self.env['qa.test.case'].flush_model(['suite_id', 'active'])
+            self.env.cr.execute("""
+                SELECT suite.code_scan_id, COUNT(tc.id)
+                FROM qa_test_case tc
+                JOIN qa_test_suite suite ON suite.id = tc.suite_id
+                WHERE suite.code_scan_id = ANY(%s) AND suite.active AND tc.active
+                GROUP BY suite.code_scan_id
+            """, (scan_ids,))
+            test_counts = dict(self.env.cr.fetchall())
+        
+        for record in self:
+            record.test_count = test_counts.get(record._origin.id, 0)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        unnamed = [vals for vals in vals_list if not vals.get('name')]
+        if unnamed:
+            customers = self.env['qa.customer'].browse({vals['customer_id'] for vals in unnamed if vals.get('customer_id')})
+            codes = {c['id']: c['code'] for c in customers.read(['code'])}
+            now = datetime.now().strftime('%Y-%m-%d %H:%M')
+            for vals in unnamed:
+                vals['name'] = f"Scan - {codes.get(vals.get('customer_id'), False)} - {now}"
+        return super().create(vals_list)
 
     @api.onchange('customer_id')
     def _onchange_customer_id(self):
@@ -85,10 +152,16 @@ class QACodeScan(models.Model):
     def action_scan_repository(self):
         """Scan repository for Odoo modules"""
         self.ensure_one()
-        self.state = 'scanning'
-        self.scan_date = fields.Datetime.now()
-        self.scan_log = ""
-        self.error_message = False
+        return self._scan_repository()
+
+    def _scan_repository(self, checkout=None):
+        """Scan repository for Odoo modules, from the given (path, commit info) checkout if any"""
+        self.write({
+            'state': 'scanning',
+            'scan_date': fields.Datetime.now(),
+            'scan_log': '',
+            'error_message': False,
+        })
         
         try:
             # Get code scanner service
@@ -98,14 +171,17 @@ class QACodeScan(models.Model):
             self._log(f"Repository: {self.repository_id.name}")
             self._log(f"Branch: {self.branch}")
             
-            # Clone/fetch repository
-            repo_path, commit_info = scanner.fetch_repository(
+            # Clone/fetch repository, unless the caller already did
+            repo_path, commit_info = checkout or scanner.fetch_repository(
                 self.repository_id, 
                 self.branch
             )
             
-            self.commit_hash = commit_info.get('hash', '')[:8]
-            self.commit_message = commit_info.get('message', '')[:100]
+            self.write({
+                'commit_hash': commit_info.get('hash', '')[:8],
+                'commit_message': commit_info.get('message', '')[:100],
+            })
+            self._remember_checkout(repo_path, self.commit_hash)
             self._log(f"Commit: {self.commit_hash} - {self.commit_message}")
             
             # Discover modules
@@ -113,12 +189,13 @@ class QACodeScan(models.Model):
             self._log(f"Found {len(modules)} Odoo modules")
             
             # Clear existing modules
-            self.module_ids.unlink()
+            self._bulk_unlink(self.module_ids)
             
             # Create module records
+            module_vals = []
             for mod_data in modules:
                 self._log(f"  - {mod_data['name']} ({mod_data['model_count']} models, {mod_data['view_count']} views)")
-                self.env['qa.scanned.module'].create({
+                module_vals.append({
                     'scan_id': self.id,
                     'technical_name': mod_data['name'],
                     'display_name': mod_data.get('display_name', mod_data['name']),
@@ -129,16 +206,18 @@ class QACodeScan(models.Model):
                     'view_count': mod_data.get('view_count', 0),
                     'selected': mod_data.get('model_count', 0) > 0,  # Auto-select if has models
                 })
+            self.env['qa.scanned.module'].create(module_vals)
             
             self._log("Scan complete!")
             self.state = 'scanned'
             
         except Exception as e:
             _logger.exception("Code scan failed")
-            self.error_message = str(e)
-            self.state = 'error'
+            self.write({'state': 'error', 'error_message': str(e)})
             self._log(f"ERROR: {str(e)}")
+            self._release_checkout()
         
+        self._flush_log()
         return True
 
     def action_analyze_modules(self):
@@ -160,24 +239,28 @@ class QACodeScan(models.Model):
         try:
             scanner = self.env['qa.code.scanner']
             
+            # Get the source code once, every module comes from the same checkout
+            repo_path = self._get_checkout(scanner)
+            if not repo_path:
+                raise UserError(_("Could not fetch repository %s", self.repository_id.name))
+            
+            # Clear existing analyses (in case of re-analyze)
+            self._bulk_unlink(selected.analysis_ids)
+            
             for module in selected:
                 self._log(f"Analyzing module: {module.technical_name}")
                 
-                # Get module source code
-                repo_path, _ = scanner.fetch_repository(self.repository_id, self.branch)
                 module_path = f"{repo_path}/{module.path}"
                 
                 # Parse module
                 analysis = scanner.analyze_module(module_path, module.technical_name)
                 
-                # Clear existing analyses (in case of re-analyze)
-                module.analysis_ids.unlink()
-                
                 # Create analysis records
+                analysis_vals = []
                 for model_data in analysis.get('models', []):
                     self._log(f"  Model: {model_data['name']} - {model_data.get('field_count', 0)} fields, {model_data.get('method_count', 0)} methods")
                     
-                    self.env['qa.model.analysis'].create({
+                    analysis_vals.append({
                         'module_id': module.id,
                         'model_name': model_data['name'],
                         'model_description': model_data.get('description', ''),
@@ -186,8 +269,9 @@ class QACodeScan(models.Model):
                         'method_count': model_data.get('method_count', 0),
                         'has_workflow': model_data.get('has_workflow', False),
                         'has_constraints': model_data.get('has_constraints', False),
-                        'analysis_json': json.dumps(model_data, indent=2),
+                        'analysis_json': json.dumps(model_data, separators=(',', ':'), ensure_ascii=False),
                     })
+                self.env['qa.model.analysis'].create(analysis_vals)
                 
                 module.state = 'analyzed'
             
@@ -196,10 +280,13 @@ class QACodeScan(models.Model):
             
         except Exception as e:
             _logger.exception("Module analysis failed")
-            self.error_message = str(e)
-            self.state = 'error'
+            self.write({'state': 'error', 'error_message': str(e)})
             self._log(f"ERROR: {str(e)}")
+        finally:
+            # Test generation works from the analyses, the clone is no longer needed
+            self._release_checkout()
         
+        self._flush_log()
         return True
 
     def action_generate_tests(self):
@@ -218,20 +305,59 @@ class QACodeScan(models.Model):
             else:
                 raise UserError(_("All selected modules have already been generated. Select additional modules or use 'Reset Module' to regenerate."))
         
+        if not any([self.include_crud_tests, self.include_validation_tests, self.include_workflow_tests,
+                    self.include_security_tests, self.include_negative_tests]):
+            raise UserError(_("Please enable at least one test category to generate."))
+        
         self.state = 'generating'
         total_tests = 0
         
         try:
-            ai_generator = self.env['qa.ai.generator']
+            generator = self.env['qa.ai.generator']._get_generator()
+            
+            # Load everything the loop reads up front, in one query per model
+            analyzed_modules.read(['technical_name', 'analysis_ids'])
+            analysis_rows = analyzed_modules.analysis_ids.read([
+                'model_name', 'model_description', 'inherit_model', 'field_count',
+                'method_count', 'has_workflow', 'has_constraints', 'analysis_json',
+            ])
+            existing_suites = {}
+            for existing in self.env['qa.test.suite'].search([
+                ('code_scan_id', '=', self.id),
+                ('scanned_module_id', 'in', analyzed_modules.ids),
+            ]):
+                existing_suites.setdefault(existing.scanned_module_id.id, existing)
             
-            for module in analyzed_modules:
+            # The AI calls are independent network round-trips: run them all
+            # concurrently. The worker threads only see plain snapshots of
+            # the analyses, never records or the cursor.
+            options = {
+                'include_crud': self.include_crud_tests,
+                'include_validation': self.include_validation_tests,
+                'include_workflow': self.include_workflow_tests,
+                'include_security': self.include_security_tests,
+                'include_negative': self.include_negative_tests,
+                'max_tests': self.max_tests_per_model,
+            }
+            executor = ThreadPoolExecutor(
+                max_workers=min(_AI_MAX_WORKERS, len(analysis_rows) or 1),
+                thread_name_prefix='qa_ai_generate',
+            )
+            futures = {
+                row['id']: executor.submit(
+                    generator.generate_test_scenarios_from_code, SimpleNamespace(**row), **options
+                )
+                for row in analysis_rows if self._analysis_needs_ai(row)
+            }
+            executor.shutdown(wait=False)
+            
+            # Store the tests of each module as soon as its AI calls are back,
+            # while the calls of the other modules are still in flight
+            for module in self._modules_by_completion(analyzed_modules, futures):
                 self._log(f"Generating tests for: {module.technical_name}")
                 
                 # Check if suite already exists for this module
-                existing_suite = self.env['qa.test.suite'].search([
-                    ('code_scan_id', '=', self.id),
-                    ('scanned_module_id', '=', module.id),
-                ], limit=1)
+                existing_suite = existing_suites.get(module.id)
                 
                 if existing_suite:
                     suite = existing_suite
@@ -249,26 +375,29 @@ class QACodeScan(models.Model):
                 # Link suite back to module
                 module.suite_id = suite.id
                 
-                # Generate tests for each model
+                # Generate tests for each model, test cases and steps of the
+                # whole module are then created in two batches
+                case_vals = []
+                case_scenarios = []
                 for analysis in module.analysis_ids:
+                    if analysis.id not in futures:
+                        self._log(f"  Skipping model: {analysis.model_name} (nothing to test)")
+                        analysis.test_count = 0
+                        continue
                     self._log(f"  Generating for model: {analysis.model_name}")
                     
                     # Get test scenarios from AI
-                    scenarios = ai_generator.generate_test_scenarios_from_code(
-                        analysis,
-                        include_crud=self.include_crud_tests,
-                        include_validation=self.include_validation_tests,
-                        include_workflow=self.include_workflow_tests,
-                        include_security=self.include_security_tests,
-                        include_negative=self.include_negative_tests,
-                        max_tests=self.max_tests_per_model,
-                    )
+                    try:
+                        scenarios = futures[analysis.id].result()
+                    except Exception as e:
+                        _logger.exception("Test generation failed for model %s", analysis.model_name)
+                        self._log(f"    ERROR: {str(e)}")
+                        scenarios = []
                     
                     self._log(f"    AI returned {len(scenarios)} scenarios")
                     
-                    # Create test cases
                     for scenario in scenarios:
-                        test_case = self.env['qa.test.case'].create({
+                        case_vals.append({
                             'name': scenario.get('name', 'Test'),
                             'test_id': scenario.get('test_id', ''),
                             'description': scenario.get('description', ''),
@@ -281,44 +410,124 @@ class QACodeScan(models.Model):
                             'robot_code': scenario.get('robot_code', ''),
                             'state': 'ready',
                         })
-                        
-                        # Create test steps
-                        for i, step in enumerate(scenario.get('steps', []), 1):
-                            self.env['qa.test.step'].create({
-                                'test_case_id': test_case.id,
-                                'sequence': i,
-                                'name': step.get('name', f'Step {i}'),
-                                'action': step.get('action', ''),
-                                'expected_result': step.get('expected', ''),
-                            })
-                        
-                        total_tests += 1
+                        case_scenarios.append(scenario)
                     
                     analysis.test_count = len(scenarios)
                 
+                # Create test cases, then their steps
+                test_cases = self.env['qa.test.case'].create(case_vals)
+                step_vals = []
+                for test_case, scenario in zip(test_cases, case_scenarios):
+                    for i, step in enumerate(scenario.get('steps', []), 1):
+                        step_vals.append({
+                            'test_case_id': test_case.id,
+                            'sequence': i,
+                            'name': step.get('name', f'Step {i}'),
+                            'action': step.get('action', ''),
+                            'expected_result': step.get('expected', ''),
+                        })
+                self.env['qa.test.step'].create(step_vals)
+                total_tests += len(test_cases)
+                
                 module.state = 'generated'
-                self._log(f"  Created {sum(a.test_count for a in module.analysis_ids)} tests in suite '{suite.name}'")
+                self._log(f"  Created {len(test_cases)} tests in suite '{suite.name}'")
             
             self._log(f"Test generation complete! Total: {total_tests} tests")
             self.state = 'done'
             
         except Exception as e:
             _logger.exception("Test generation failed")
-            self.error_message = str(e)
-            self.state = 'error'
+            self.write({'state': 'error', 'error_message': str(e)})
             self._log(f"ERROR: {str(e)}")
         
+        self._flush_log()
         return True
 
     def action_scan_and_generate(self):
+        """Queue the full workflow (scan, analyze, generate) for the background job"""
+        self.write({'full_run_queued': True})
+        self.env.ref('qa_test_generator.ir_cron_code_scan_full_run').sudo()._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Scan Queued',
+                'message': 'The scan will run in the background, refresh the page to follow its progress.',
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
+
+    @api.model
+    def _modules_by_completion(self, modules, futures):
+        """Yield modules once the AI calls of all their analyses are done"""
+        pending = {}
+        module_of = {}
+        for module in modules:
+            analysis_ids = [a_id for a_id in module.analysis_ids.ids if a_id in futures]
+            pending[module.id] = len(analysis_ids)
+            for a_id in analysis_ids:
+                module_of[futures[a_id]] = module
+        
+        for module in modules:
+            if not pending[module.id]:
+                yield module
+        for future in as_completed(module_of):
+            module = module_of[future]
+            pending[module.id] -= 1
+            if not pending[module.id]:
+                yield module
+
+    def _analysis_needs_ai(self, analysis):
+        """Whether any enabled test category applies to the analyzed model (a read() dict)"""
+        if not analysis['field_count'] and not analysis['method_count']:
+            return False
+        if self.include_workflow_tests and not analysis['has_workflow']:
+            # Workflow tests alone have nothing to cover on a model without states
+            return any([self.include_crud_tests, self.include_validation_tests,
+                        self.include_security_tests, self.include_negative_tests])
+        return True
+
+    def _run_full_workflow(self, checkout=None):
         """Full workflow: scan, analyze, generate"""
-        self.action_scan_repository()
-        if self.state == 'scanned':
-            self.action_analyze_modules()
-        if self.state == 'analyzed':
-            self.action_generate_tests()
+        try:
+            self._scan_repository(checkout)
+            if self.state == 'scanned':
+                self.action_analyze_modules()
+            if self.state == 'analyzed':
+                self.action_generate_tests()
+        finally:
+            self._release_checkout()
         return True
 
+    @api.model
+    def _cron_run_queued_scans(self):
+        """Cron job running the full workflow of the scans queued from the UI"""
+        scans = self.search([('full_run_queued', '=', True)])
+        # Clone all queued repositories up front, their network waits overlap
+        checkouts = self.env['qa.code.scanner'].fetch_repositories(
+            [(scan.repository_id, scan.branch) for scan in scans]
+        )
+        try:
+            for scan, checkout in zip(scans, checkouts):
+                scan.full_run_queued = False
+                try:
+                    if isinstance(checkout, Exception):
+                        raise checkout
+                    with self.env.cr.savepoint():
+                        scan._run_full_workflow(checkout)
+                except Exception as e:
+                    _logger.exception("Full scan workflow failed")
+                    scan.write({'state': 'error', 'error_message': str(e)})
+                # Commit every scan on its own, progress shows up scan by scan
+                self.env.cr.commit()
+        finally:
+            # Workflows remove their clone, this catches the ones never handed over
+            for checkout in checkouts:
+                if not isinstance(checkout, Exception):
+                    shutil.rmtree(checkout[0], ignore_errors=True)
+
     def action_view_tests(self):
         """View generated test cases"""
         self.ensure_one()
@@ -357,13 +566,68 @@ class QACodeScan(models.Model):
         # Clear modules (cascades to analyses)
         self.module_ids.unlink()
         
-        self.state = 'draft'
-        self.error_message = False
-        self.scan_log = ''
+        self.write({'state': 'draft', 'error_message': False, 'scan_log': ''})
+        self._release_checkout()
+
+    def _bulk_unlink(self, records):
+        """
+        Delete scan children (modules, analyses) with a single DELETE
+        
+        Their dependents are removed or detached by the ON DELETE rules of
+        the foreign keys, none of these models overrides unlink().
+        """
+        if not records:
+            return
+        records.check_access('unlink')
+        self.env.flush_all()
+        self.env.cr.execute(f"DELETE FROM {records._table} WHERE id = ANY(%s)", (records.ids,))
+        self.env.invalidate_all()
+
+    def _remember_checkout(self, repo_path, commit_hash):
+        key = (self.env.cr.dbname, self.id)
+        stale = []
+        with _CHECKOUTS_LOCK:
+            previous = _CHECKOUTS.pop(key, None)
+            if previous and previous[0] != repo_path:
+                stale.append(previous[0])
+            _CHECKOUTS[key] = (repo_path, commit_hash)
+            while len(_CHECKOUTS) > _CHECKOUTS_MAX:
+                stale.append(_CHECKOUTS.popitem(last=False)[1][0])
+        _remove_checkouts(stale)
+
+    def _release_checkout(self):
+        """Remove the clone of the scan, if this process holds one"""
+        with _CHECKOUTS_LOCK:
+            checkout = _CHECKOUTS.pop((self.env.cr.dbname, self.id), None)
+        if checkout:
+            _remove_checkouts([checkout[0]])
+
+    def _get_checkout(self, scanner):
+        """Path of a clone at the scanned commit, cloning only when none is at hand"""
+        key = (self.env.cr.dbname, self.id)
+        with _CHECKOUTS_LOCK:
+            cached = _CHECKOUTS.get(key)
+            if cached:
+                _CHECKOUTS.move_to_end(key)
+        if cached and cached[1] == self.commit_hash and os.path.isdir(cached[0]):
+            return cached[0]
+        repo_path, commit_info = scanner.fetch_repository(self.repository_id, self.branch)
+        self._remember_checkout(repo_path, commit_info.get('hash', '')[:8])
+        return repo_path
 
     def _log(self, message):
-        """Append to scan log"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_line = f"[{timestamp}] {message}\n"
-        self.scan_log = (self.scan_log or '') + log_line
+        """Append to scan log (buffered until _flush_log or commit)"""
+        log_line = f"[{time.strftime('%H:%M:%S')}] {message}\n"
+        key = f'qa.code.scan.log.{self.id}'
+        buffer = self.env.cr.precommit.data.get(key)
+        if buffer is None:
+            buffer = self.env.cr.precommit.data[key] = []
+            self.env.cr.precommit.add(self._flush_log)
+        buffer.append(log_line)
+
+    def _flush_log(self):
+        """Write the buffered log lines to scan_log in one go"""
+        lines = self.env.cr.precommit.data.pop(f'qa.code.scan.log.{self.id}', None)
+        if lines:
+            self.scan_log = (self.scan_log or '') + ''.join(lines)
 
@@ -1,17 +1,418 @@
 # -*- coding: utf-8 -*-
 
+import odoo
 from odoo import models, api
+from odoo.tools import config
+from odoo.tools.lru import LRU
 import os
 import re
 import ast
+import csv
 import json
+import hashlib
+import io
 import tempfile
 import shutil
-import subprocess
+import asyncio
+import multiprocessing
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
 
 _logger = logging.getLogger(__name__)
 
+_RE_VIEW_MODEL = re.compile(r'model=["\']ir\.ui\.view["\']')
+_RE_VIEW_TAGS = re.compile(
+    r'<field name="model">(?P<model>[^<]+)</field>'
+    r'|<button[^>]*name=["\'](?P<button>[^"\']+)["\'][^>]*>'
+    r'|<field[^>]*name=["\'](?P<field>[^"\']+)["\']'
+)
+
+# Parse results keyed by file content, every scan clones into a fresh directory
+_PARSE_CACHE = LRU(4096)
+
+# Model files are parsed in worker processes only when there are enough to pay for the fork
+_PARSE_POOL_MIN_FILES = 32
+_PARSE_POOL_MAX_WORKERS = 8
+
+# Sparse checkout of module sources, views and access rights, no static assets or translations
+_SPARSE_PATTERNS = ('*.py', 'views/', 'security/')
+
+_MANIFEST_KEYS = frozenset(('name', 'version', 'depends'))
+
+# Larger files are generated data, not hand written modules worth scanning
+_MAX_SCAN_SIZE = 2 * 1024 * 1024
+
+
+def _iter_files(directory, suffix, recursive=True, skip_private=False):
+    """Yield paths of files ending with suffix, depth first like os.walk"""
+    stack = [directory]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if skip_private and entry.name.startswith('__'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    yield entry.path
+        if recursive:
+            stack.extend(reversed(subdirs))
+
+
+def _manifest_values(content):
+    """Safely evaluate only the manifest keys the scanner reads, long descriptions are skipped"""
+    tree = ast.parse(content, mode='eval')
+    if not isinstance(tree.body, ast.Dict):
+        return {}
+    return {
+        key.value: ast.literal_eval(value)
+        for key, value in zip(tree.body.keys, tree.body.values)
+        if isinstance(key, ast.Constant) and key.value in _MANIFEST_KEYS
+    }
+
+
+def _read_source(path):
+    """Read a file to scan, None when it is over the size limit"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > _MAX_SCAN_SIZE:
+            _logger.warning(f"Skipping {path}: {size} bytes is over the scan size limit")
+            return None
+        return f.read()
+
+
+def _source_key(kind, data):
+    return kind, hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _scan_models_source(content):
+    """Extract model definitions and count the classes declaring a model _name"""
+    models = []
+    count = 0
+    tree = ast.parse(content)
+    # Odoo models are declared at module level, no need to visit function bodies
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            model_info = _extract_model_info(node)
+            if model_info:
+                models.append(model_info)
+            if _declares_name(node):
+                count += 1
+    return {'count': count, 'models': models}
+
+
+def _declares_name(class_node):
+    return any(
+        isinstance(item, ast.Assign) and isinstance(item.value, ast.Constant)
+        and any(isinstance(target, ast.Name) and target.id == '_name' for target in item.targets)
+        for item in class_node.body
+    )
+
+
+def _parse_models_worker(data):
+    """Pool entry point, failures are left for the serial pass to report"""
+    try:
+        return _scan_models_source(data.decode('utf-8'))
+    except Exception:
+        return None
+
+
+async def _run_git(*args, cwd=None, timeout=120, output=False):
+    """Run a git command without blocking the event loop, return (returncode, stdout, stderr)"""
+    # Stdout is only piped when asked for, stderr is only decoded on failure
+    proc = await asyncio.create_subprocess_exec(
+        'git', *args,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE if output else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        # Fail right away on missing credentials instead of waiting for the timeout
+        env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'},
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise Exception(f"Git {args[0]} timed out after {timeout} seconds")
+    return (
+        proc.returncode,
+        stdout.decode(errors='replace') if stdout else '',
+        stderr.decode(errors='replace') if proc.returncode else '',
+    )
+
+
+async def _clone_repository(clone_url, branch, clone_dir=None):
+    """Clone a branch into a new temp directory and return (path, commit info)"""
+    # Create temp directory for repo
+    temp_dir = tempfile.mkdtemp(prefix='qa_scan_', dir=clone_dir)
+    
+    try:
+        # Clone repository
+        _logger.info(f"Cloning repository to {temp_dir}")
+        returncode, _stdout, stderr = await _run_git(
+            'clone', '--depth', '1', '--filter=blob:none', '--sparse',
+            '--branch', branch, clone_url, temp_dir,
+        )
+        if returncode != 0:
+            raise Exception(f"Git clone failed: {stderr}")
+        
+        # Check out only what the scanner reads, other blobs are never downloaded
+        returncode, _stdout, stderr = await _run_git(
+            'sparse-checkout', 'set', '--no-cone', *_SPARSE_PATTERNS, cwd=temp_dir,
+        )
+        if returncode != 0:
+            _logger.warning(f"Sparse checkout failed, checking out the whole tree: {stderr}")
+            returncode, _stdout, stderr = await _run_git('sparse-checkout', 'disable', cwd=temp_dir)
+            if returncode != 0:
+                raise Exception(f"Git checkout failed: {stderr}")
+        
+        # Get commit info
+        returncode, stdout, _stderr = await _run_git('log', '-1', '--format=%H|%s', cwd=temp_dir, output=True)
+        
+        commit_info = {'hash': '', 'message': ''}
+        if returncode == 0:
+            parts = stdout.strip().split('|', 1)
+            commit_info = {
+                'hash': parts[0] if parts else '',
+                'message': parts[1] if len(parts) > 1 else ''
+            }
+        
+        return temp_dir, commit_info
+    
+    except BaseException:
+        # Clean up on error, cancellation included
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+
+def _parse_view_records(data):
+    """Collect buttons and fields of each ir.ui.view record, one record in memory at a time"""
+    view_info = {}
+    # Repository contents are untrusted, never expand entities or fetch anything
+    for _event, record in etree.iterparse(io.BytesIO(data), events=('end',), tag='record',
+                                          resolve_entities=False, no_network=True):
+        model = record.get('model') == 'ir.ui.view' and record.findtext("field[@name='model']")
+        if model:
+            info = view_info.setdefault(model.strip(), {'buttons': [], 'fields': []})
+            for arch in record.iterfind("field[@name='arch']"):
+                info['buttons'].extend(arch.xpath('.//button/@name', smart_strings=False))
+                info['fields'].extend(arch.xpath('.//field/@name', smart_strings=False))
+        record.clear()
+        while record.getprevious() is not None:
+            del record.getparent()[0]
+    # Several views of a model repeat the same buttons and fields
+    return {
+        model: {'buttons': list(dict.fromkeys(info['buttons'])), 'fields': list(dict.fromkeys(info['fields']))}
+        for model, info in view_info.items()
+    }
+
+
+def _match_view_patterns(content):
+    """Regex fallback for view files lxml cannot parse"""
+    view_info = {}
+    buttons = []
+    fields = []
+    models = []
+    
+    # Single pass over the file, buttons, fields and view models are told apart by group
+    for match in _RE_VIEW_TAGS.finditer(content):
+        kind = match.lastgroup
+        if kind == 'model':
+            models.append(match.group('model'))
+            # The model tag is a field tag too
+            fields.append('model')
+        elif kind == 'button':
+            buttons.append(match.group('button'))
+        else:
+            fields.append(match.group('field'))
+    
+    # Try to associate with model, every model gets the file's buttons and fields once
+    buttons = list(dict.fromkeys(buttons))
+    fields = list(dict.fromkeys(fields))
+    for model in models:
+        if model not in view_info:
+            view_info[model] = {'buttons': list(buttons), 'fields': list(fields)}
+    return view_info
+
+
+def _extract_model_info(class_node):
+    """Extract model information from AST class node"""
+    model_name = None
+    inherit = None
+    description = None
+    fields = []
+    methods = []
+    constraints = []
+    sql_constraints = []
+    has_workflow = False
+    states = []
+    
+    for item in class_node.body:
+        if isinstance(item, ast.Assign):
+            for target in item.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                # Look for _name, _inherit, _description
+                if target.id == '_name' and isinstance(item.value, ast.Constant):
+                    model_name = item.value.value
+                elif target.id == '_inherit':
+                    if isinstance(item.value, ast.Constant):
+                        inherit = item.value.value
+                    elif isinstance(item.value, ast.List):
+                        inherit = ', '.join(
+                            el.value for el in item.value.elts 
+                            if isinstance(el, ast.Constant)
+                        )
+                elif target.id == '_description' and isinstance(item.value, ast.Constant):
+                    description = item.value.value
+                elif target.id == '_sql_constraints' and isinstance(item.value, ast.List):
+                    for el in item.value.elts:
+                        if isinstance(el, ast.Tuple) and len(el.elts) >= 2:
+                            sql_constraints.append({
+                                'name': el.elts[0].value if isinstance(el.elts[0], ast.Constant) else '',
+                                'message': el.elts[2].value if len(el.elts) > 2 and isinstance(el.elts[2], ast.Constant) else '',
+                            })
+                # Look for field definitions
+                elif isinstance(item.value, ast.Call):
+                    field_info = _extract_field_info(target.id, item.value)
+                    if field_info:
+                        fields.append(field_info)
+                        # Check for state field (workflow)
+                        if field_info['name'] == 'state' and field_info['type'] == 'Selection':
+                            has_workflow = True
+                            states = field_info.get('selection', [])
+        
+        # Look for methods
+        elif isinstance(item, ast.FunctionDef):
+            method_info = _extract_method_info(item)
+            if method_info:
+                methods.append(method_info)
+                # Check for constraint decorators
+                for decorator in item.decorator_list:
+                    if isinstance(decorator, ast.Call):
+                        if hasattr(decorator.func, 'attr') and decorator.func.attr == 'constrains':
+                            constraints.append({
+                                'name': item.name,
+                                'fields': [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
+                            })
+    
+    if not model_name and not inherit:
+        return None
+    
+    return {
+        'name': model_name or inherit,
+        'inherit': inherit if model_name else None,
+        'description': description or '',
+        'fields': fields,
+        'field_count': len(fields),
+        'methods': methods,
+        'method_count': len(methods),
+        'constraints': constraints,
+        'sql_constraints': sql_constraints,
+        'has_constraints': len(constraints) > 0 or len(sql_constraints) > 0,
+        'has_workflow': has_workflow,
+        'states': states,
+    }
+
+
+def _extract_field_info(field_name, call_node):
+    """Extract field information from AST Call node"""
+    # Check if it's a fields.X call
+    if not isinstance(call_node.func, ast.Attribute):
+        return None
+    
+    if not isinstance(call_node.func.value, ast.Name):
+        return None
+    
+    if call_node.func.value.id != 'fields':
+        return None
+    
+    field_type = call_node.func.attr
+    
+    field_info = {
+        'name': field_name,
+        'type': field_type,
+        'required': False,
+        'readonly': False,
+        'compute': None,
+        'related': None,
+        'default': None,
+        'comodel': None,
+        'selection': [],
+    }
+    
+    # Parse keyword arguments
+    for kw in call_node.keywords:
+        if kw.arg == 'required' and isinstance(kw.value, ast.Constant):
+            field_info['required'] = kw.value.value
+        elif kw.arg == 'readonly' and isinstance(kw.value, ast.Constant):
+            field_info['readonly'] = kw.value.value
+        elif kw.arg == 'compute' and isinstance(kw.value, ast.Constant):
+            field_info['compute'] = kw.value.value
+        elif kw.arg == 'related' and isinstance(kw.value, ast.Constant):
+            field_info['related'] = kw.value.value
+        elif kw.arg == 'comodel_name' and isinstance(kw.value, ast.Constant):
+            field_info['comodel'] = kw.value.value
+        elif kw.arg == 'selection' and isinstance(kw.value, ast.List):
+            for el in kw.value.elts:
+                if isinstance(el, ast.Tuple) and len(el.elts) >= 1:
+                    if isinstance(el.elts[0], ast.Constant):
+                        field_info['selection'].append(el.elts[0].value)
+    
+    # Get comodel from first positional arg for Many2one/One2many
+    if field_type in ('Many2one', 'One2many', 'Many2many') and call_node.args:
+        if isinstance(call_node.args[0], ast.Constant):
+            field_info['comodel'] = call_node.args[0].value
+    
+    return field_info
+
+
+def _extract_method_info(func_node):
+    """Extract method information from AST FunctionDef node"""
+    if func_node.name.startswith('_') and not func_node.name.startswith('_compute'):
+        is_private = True
+    else:
+        is_private = False
+    
+    # Check decorators
+    is_api_model = False
+    is_api_depends = False
+    is_api_onchange = False
+    is_api_constrains = False
+    depends_fields = []
+    onchange_fields = []
+    
+    for decorator in func_node.decorator_list:
+        if isinstance(decorator, ast.Attribute):
+            if decorator.attr == 'model':
+                is_api_model = True
+        elif isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute):
+            if decorator.func.attr == 'depends':
+                is_api_depends = True
+                depends_fields = [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
+            elif decorator.func.attr == 'onchange':
+                is_api_onchange = True
+                onchange_fields = [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
+            elif decorator.func.attr == 'constrains':
+                is_api_constrains = True
+    
+    # Determine if it's an action method (likely a button)
+    is_action = func_node.name.startswith('action_') or func_node.name.startswith('button_')
+    
+    return {
+        'name': func_node.name,
+        'is_private': is_private,
+        'is_action': is_action,
+        'is_compute': is_api_depends or func_node.name.startswith('_compute'),
+        'is_onchange': is_api_onchange,
+        'is_constraint': is_api_constrains,
+        'depends_fields': depends_fields,
+        'onchange_fields': onchange_fields,
+    }
+
 
 class QACodeScanner(models.AbstractModel):
     _name = 'qa.code.scanner'
@@ -20,88 +421,103 @@ class QACodeScanner(models.AbstractModel):
     @api.model
     def fetch_repository(self, repository, branch='main'):
         """Clone or fetch repository and return path"""
-        # Create temp directory for repo
-        temp_dir = tempfile.mkdtemp(prefix='qa_scan_')
-        
-        try:
-            # Build clone URL with authentication
-            clone_url = repository.repo_url
-            if repository.auth_type == 'token' and repository.access_token:
-                # Insert token into URL
-                if 'github.com' in clone_url:
-                    clone_url = clone_url.replace('https://', f'https://{repository.access_token}@')
-                elif 'gitlab' in clone_url:
-                    clone_url = clone_url.replace('https://', f'https://oauth2:{repository.access_token}@')
-                elif 'bitbucket' in clone_url:
-                    clone_url = clone_url.replace('https://', f'https://x-token-auth:{repository.access_token}@')
-            
-            # Clone repository
-            _logger.info(f"Cloning repository to {temp_dir}")
-            result = subprocess.run(
-                ['git', 'clone', '--depth', '1', '--branch', branch, clone_url, temp_dir],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"Git clone failed: {result.stderr}")
-            
-            # Get commit info
-            commit_result = subprocess.run(
-                ['git', 'log', '-1', '--format=%H|%s'],
-                cwd=temp_dir,
-                capture_output=True,
-                text=True
+        return asyncio.run(_clone_repository(self._clone_url(repository), branch, self._clone_dir()))
+
+    @api.model
+    def fetch_repositories(self, sources):
+        """Clone (repository, branch) pairs concurrently, failed clones come back as exceptions"""
+        clone_dir = self._clone_dir()
+        
+        async def clone_all():
+            return await asyncio.gather(
+                *(_clone_repository(self._clone_url(repository), branch, clone_dir)
+                  for repository, branch in sources),
+                return_exceptions=True,
             )
-            
-            commit_info = {'hash': '', 'message': ''}
-            if commit_result.returncode == 0:
-                parts = commit_result.stdout.strip().split('|', 1)
-                commit_info = {
-                    'hash': parts[0] if parts else '',
-                    'message': parts[1] if len(parts) > 1 else ''
-                }
-            
-            return temp_dir, commit_info
-            
-        except Exception as e:
-            # Clean up on error
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            raise
+        return asyncio.run(clone_all())
+
+    @api.model
+    def _clone_dir(self):
+        """Parent directory of the clones, the system temp dir unless qa_test_generator.clone_dir is set (e.g. a tmpfs)"""
+        return self.env['ir.config_parameter'].sudo().get_param('qa_test_generator.clone_dir') or None
+
+    @api.model
+    def _clone_url(self, repository):
+        """Build clone URL with authentication"""
+        clone_url = repository.repo_url
+        if repository.auth_type == 'token' and repository.access_token:
+            # Insert token into URL
+            if 'github.com' in clone_url:
+                clone_url = clone_url.replace('https://', f'https://{repository.access_token}@')
+            elif 'gitlab' in clone_url:
+                clone_url = clone_url.replace('https://', f'https://oauth2:{repository.access_token}@')
+            elif 'bitbucket' in clone_url:
+                clone_url = clone_url.replace('https://', f'https://x-token-auth:{repository.access_token}@')
+        return clone_url
 
     @api.model
     def discover_modules(self, repo_path):
         """Find all Odoo modules in repository"""
-        modules = []
+        found = []
+        module_files = {}
+        module_path = None
         
-        # Walk directory looking for __manifest__.py
+        # Walk directory once looking for __manifest__.py, collecting the
+        # model and view files of each module on the way down
         for root, dirs, files in os.walk(repo_path):
             # Skip hidden directories and common non-module dirs
             dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', 'venv', '__pycache__']]
             
+            # Walk is depth first, so leaving the module subtree means we are done with it
+            if module_path and not root.startswith(module_path + os.sep):
+                module_path = None
+            
             if '__manifest__.py' in files:
                 module_path = root
-                module_name = os.path.basename(module_path)
-                rel_path = os.path.relpath(module_path, repo_path)
-                
-                # Parse manifest
-                manifest_data = self._parse_manifest(os.path.join(module_path, '__manifest__.py'))
-                
-                # Count models and views
-                model_count = self._count_models(module_path)
-                view_count = self._count_views(module_path)
-                
-                modules.append({
-                    'name': module_name,
-                    'display_name': manifest_data.get('name', module_name),
-                    'version': manifest_data.get('version', ''),
-                    'path': rel_path,
-                    'depends': manifest_data.get('depends', []),
-                    'model_count': model_count,
-                    'view_count': view_count,
-                })
+                module_files[root] = {'py': [], 'xml': []}
+                found.append(root)
+            
+            if not module_path:
+                continue
+            
+            collected = module_files[module_path]
+            parts = [] if root == module_path else os.path.relpath(root, module_path).split(os.sep)
+            if not parts:
+                # Modules do not nest, only models/ and views/ are worth descending into
+                dirs[:] = [d for d in dirs if d in ('models', 'views')]
+            elif parts[0] == 'models':
+                dirs[:] = [d for d in dirs if not d.startswith('__')]
+            
+            if not parts or parts[0] == 'models':
+                collected['py'].extend(
+                    os.path.join(root, f) for f in files
+                    if f.endswith('.py') and not f.startswith('__')
+                )
+            else:
+                collected['xml'].extend(os.path.join(root, f) for f in files if f.endswith('.xml'))
+        
+        modules = []
+        for module_path in found:
+            module_name = os.path.basename(module_path)
+            rel_path = os.path.relpath(module_path, repo_path)
+            
+            # Parse manifest
+            manifest_data = self._parse_manifest(os.path.join(module_path, '__manifest__.py'))
+            
+            # Count models and views
+            collected = module_files[module_path]
+            model_count = sum(self._count_model_classes(py_file) for py_file in collected['py'])
+            view_count = sum(self._count_view_records(xml_file) for xml_file in collected['xml'])
+            
+            modules.append({
+                'name': module_name,
+                'display_name': manifest_data.get('name', module_name),
+                'version': manifest_data.get('version', ''),
+                'path': rel_path,
+                'depends': manifest_data.get('depends', []),
+                'model_count': model_count,
+                'view_count': view_count,
+            })
         
         return modules
 
@@ -109,93 +525,59 @@ class QACodeScanner(models.AbstractModel):
     def _parse_manifest(self, manifest_path):
         """Parse __manifest__.py file"""
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            # Safely evaluate the manifest dict
-            return ast.literal_eval(content)
+            data = _read_source(manifest_path)
+            if data is None:
+                return {}
+            key = _source_key('manifest', data)
+            manifest = _PARSE_CACHE.get(key)
+            if manifest is None:
+                manifest = _PARSE_CACHE[key] = _manifest_values(data.decode('utf-8'))
+            return dict(manifest)
         except Exception as e:
             _logger.warning(f"Failed to parse manifest {manifest_path}: {e}")
             return {}
 
-    @api.model
-    def _count_models(self, module_path):
-        """Count model definitions in module"""
-        count = 0
-        models_dir = os.path.join(module_path, 'models')
-        
-        if os.path.isdir(models_dir):
-            for py_file in self._find_python_files(models_dir):
-                count += self._count_model_classes(py_file)
-        
-        # Also check root for models
-        for py_file in self._find_python_files(module_path, recursive=False):
-            count += self._count_model_classes(py_file)
-        
-        return count
-
     @api.model
     def _count_model_classes(self, py_file):
         """Count Model classes in a Python file"""
         count = 0
         try:
-            with open(py_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            # Simple regex to find _name = 'xxx' patterns
-            count = len(re.findall(r"_name\s*=\s*['\"][\w.]+['\"]", content))
+            data = _read_source(py_file)
+            # Only files mentioning _name are worth an AST parse
+            if data is None or b'_name' not in data:
+                return 0
+            scanned = self._scan_python_file(py_file, data)
+            count = scanned['count'] if scanned else 0
         except:
             pass
         return count
 
-    @api.model
-    def _count_views(self, module_path):
-        """Count view definitions in module"""
-        count = 0
-        views_dir = os.path.join(module_path, 'views')
-        
-        if os.path.isdir(views_dir):
-            for xml_file in self._find_xml_files(views_dir):
-                count += self._count_view_records(xml_file)
-        
-        return count
-
     @api.model
     def _count_view_records(self, xml_file):
         """Count ir.ui.view records in XML file"""
         count = 0
         try:
-            with open(xml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            data = _read_source(xml_file)
+            if data is None:
+                return 0
+            content = data.decode('utf-8')
             # Count view records
-            count = len(re.findall(r'model=["\']ir\.ui\.view["\']', content))
+            if 'ir.ui.view' not in content:
+                return 0
+            count = sum(1 for _match in _RE_VIEW_MODEL.finditer(content))
         except:
             pass
         return count
 
     @api.model
     def _find_python_files(self, directory, recursive=True):
-        """Find all Python files in directory"""
-        files = []
-        if recursive:
-            for root, dirs, filenames in os.walk(directory):
-                dirs[:] = [d for d in dirs if not d.startswith('__')]
-                for f in filenames:
-                    if f.endswith('.py') and not f.startswith('__'):
-                        files.append(os.path.join(root, f))
-        else:
-            for f in os.listdir(directory):
-                if f.endswith('.py') and not f.startswith('__'):
-                    files.append(os.path.join(directory, f))
-        return files
+        """Find all Python files in directory, lazily"""
+        return _iter_files(directory, '.py', recursive=recursive, skip_private=True)
 
     @api.model
     def _find_xml_files(self, directory):
-        """Find all XML files in directory"""
-        files = []
-        for root, dirs, filenames in os.walk(directory):
-            for f in filenames:
-                if f.endswith('.xml'):
-                    files.append(os.path.join(root, f))
-        return files
+        """Find all XML files in directory, lazily"""
+        return _iter_files(directory, '.xml')
 
     @api.model
     def analyze_module(self, module_path, module_name):
@@ -208,7 +590,11 @@ class QACodeScanner(models.AbstractModel):
         # Find and parse all Python model files
         models_dir = os.path.join(module_path, 'models')
         if os.path.isdir(models_dir):
-            for py_file in self._find_python_files(models_dir):
+            # The directory is walked once, list() lets both the pool prefill
+            # and the parse loop below consume the files
+            py_files = list(self._find_python_files(models_dir))
+            self._prefill_model_cache(py_files)
+            for py_file in py_files:
                 models = self._parse_python_models(py_file)
                 analysis['models'].extend(models)
         
@@ -233,204 +619,70 @@ class QACodeScanner(models.AbstractModel):
         return analysis
 
     @api.model
-    def _parse_python_models(self, py_file):
-        """Parse Python file and extract model definitions"""
-        models = []
-        
-        try:
-            with open(py_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    model_info = self._extract_model_info(node, content)
-                    if model_info:
-                        models.append(model_info)
-        
-        except Exception as e:
-            _logger.warning(f"Failed to parse {py_file}: {e}")
-        
-        return models
+    def _prefill_model_cache(self, py_files):
+        """Parse uncached model files in worker processes, AST parsing holds the GIL"""
+        if len(py_files) < _PARSE_POOL_MIN_FILES or not self._can_fork_parsers():
+            return
+        pending = {}
+        for py_file in py_files:
+            try:
+                data = _read_source(py_file)
+            except OSError:
+                continue
+            if data is None:
+                continue
+            key = _source_key('python', data)
+            if key not in _PARSE_CACHE:
+                pending[key] = data
+        if len(pending) < _PARSE_POOL_MIN_FILES:
+            return
+        
+        # Workers are forked (a spawned interpreter could not import odoo.addons),
+        # see _can_fork_parsers for when that is safe
+        workers = min(os.cpu_count() or 1, _PARSE_POOL_MAX_WORKERS)
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            results = executor.map(_parse_models_worker, pending.values(), chunksize=8)
+            for key, scanned in zip(pending, results):
+                if scanned is not None:
+                    _PARSE_CACHE[key] = scanned
 
     @api.model
-    def _extract_model_info(self, class_node, source_content):
-        """Extract model information from AST class node"""
-        model_name = None
-        inherit = None
-        description = None
-        fields = []
-        methods = []
-        constraints = []
-        sql_constraints = []
-        has_workflow = False
-        states = []
-        
-        for item in class_node.body:
-            # Look for _name, _inherit, _description
-            if isinstance(item, ast.Assign):
-                for target in item.targets:
-                    if isinstance(target, ast.Name):
-                        if target.id == '_name' and isinstance(item.value, ast.Constant):
-                            model_name = item.value.value
-                        elif target.id == '_inherit':
-                            if isinstance(item.value, ast.Constant):
-                                inherit = item.value.value
-                            elif isinstance(item.value, ast.List):
-                                inherit = ', '.join(
-                                    el.value for el in item.value.elts 
-                                    if isinstance(el, ast.Constant)
-                                )
-                        elif target.id == '_description' and isinstance(item.value, ast.Constant):
-                            description = item.value.value
-                        elif target.id == '_sql_constraints' and isinstance(item.value, ast.List):
-                            for el in item.value.elts:
-                                if isinstance(el, ast.Tuple) and len(el.elts) >= 2:
-                                    sql_constraints.append({
-                                        'name': el.elts[0].value if isinstance(el.elts[0], ast.Constant) else '',
-                                        'message': el.elts[2].value if len(el.elts) > 2 and isinstance(el.elts[2], ast.Constant) else '',
-                                    })
-            
-            # Look for field definitions
-            if isinstance(item, ast.Assign):
-                for target in item.targets:
-                    if isinstance(target, ast.Name) and isinstance(item.value, ast.Call):
-                        field_info = self._extract_field_info(target.id, item.value)
-                        if field_info:
-                            fields.append(field_info)
-                            # Check for state field (workflow)
-                            if field_info['name'] == 'state' and field_info['type'] == 'Selection':
-                                has_workflow = True
-                                states = field_info.get('selection', [])
-            
-            # Look for methods
-            if isinstance(item, ast.FunctionDef):
-                method_info = self._extract_method_info(item)
-                if method_info:
-                    methods.append(method_info)
-                    # Check for constraint decorators
-                    for decorator in item.decorator_list:
-                        if isinstance(decorator, ast.Call):
-                            if hasattr(decorator.func, 'attr') and decorator.func.attr == 'constrains':
-                                constraints.append({
-                                    'name': item.name,
-                                    'fields': [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
-                                })
-        
-        if not model_name and not inherit:
-            return None
-        
-        return {
-            'name': model_name or inherit,
-            'inherit': inherit if model_name else None,
-            'description': description or '',
-            'fields': fields,
-            'field_count': len(fields),
-            'methods': methods,
-            'method_count': len(methods),
-            'constraints': constraints,
-            'sql_constraints': sql_constraints,
-            'has_constraints': len(constraints) > 0 or len(sql_constraints) > 0,
-            'has_workflow': has_workflow,
-            'states': states,
-        }
+    def _can_fork_parsers(self):
+        """Whether this process may fork the model parsing pool"""
+        # Only prefork workers: their request runs alone, while the threaded and
+        # evented servers serve other requests and crons in threads or greenlets
+        # whose locks a forked child could inherit held. Children only run ast on
+        # bytes they are given and leave through os._exit, never using the
+        # inherited database sockets.
+        if not config['workers'] or odoo.evented:
+            return False
+        return 'fork' in multiprocessing.get_all_start_methods()
 
     @api.model
-    def _extract_field_info(self, field_name, call_node):
-        """Extract field information from AST Call node"""
-        # Check if it's a fields.X call
-        if not isinstance(call_node.func, ast.Attribute):
-            return None
-        
-        if not isinstance(call_node.func.value, ast.Name):
-            return None
-        
-        if call_node.func.value.id != 'fields':
+    def _scan_python_file(self, py_file, data=None):
+        """Parse a Python file once, the cached result serves both counting and analysis"""
+        try:
+            if data is None:
+                data = _read_source(py_file)
+                if data is None:
+                    return None
+            key = _source_key('python', data)
+            scanned = _PARSE_CACHE.get(key)
+            if scanned is None:
+                scanned = _PARSE_CACHE[key] = _scan_models_source(data.decode('utf-8'))
+            return scanned
+        except Exception as e:
+            _logger.warning(f"Failed to parse {py_file}: {e}")
             return None
-        
-        field_type = call_node.func.attr
-        
-        field_info = {
-            'name': field_name,
-            'type': field_type,
-            'required': False,
-            'readonly': False,
-            'compute': None,
-            'related': None,
-            'default': None,
-            'comodel': None,
-            'selection': [],
-        }
-        
-        # Parse keyword arguments
-        for kw in call_node.keywords:
-            if kw.arg == 'required' and isinstance(kw.value, ast.Constant):
-                field_info['required'] = kw.value.value
-            elif kw.arg == 'readonly' and isinstance(kw.value, ast.Constant):
-                field_info['readonly'] = kw.value.value
-            elif kw.arg == 'compute' and isinstance(kw.value, ast.Constant):
-                field_info['compute'] = kw.value.value
-            elif kw.arg == 'related' and isinstance(kw.value, ast.Constant):
-                field_info['related'] = kw.value.value
-            elif kw.arg == 'comodel_name' and isinstance(kw.value, ast.Constant):
-                field_info['comodel'] = kw.value.value
-            elif kw.arg == 'selection' and isinstance(kw.value, ast.List):
-                for el in kw.value.elts:
-                    if isinstance(el, ast.Tuple) and len(el.elts) >= 1:
-                        if isinstance(el.elts[0], ast.Constant):
-                            field_info['selection'].append(el.elts[0].value)
-        
-        # Get comodel from first positional arg for Many2one/One2many
-        if field_type in ('Many2one', 'One2many', 'Many2many') and call_node.args:
-            if isinstance(call_node.args[0], ast.Constant):
-                field_info['comodel'] = call_node.args[0].value
-        
-        return field_info
 
     @api.model
-    def _extract_method_info(self, func_node):
-        """Extract method information from AST FunctionDef node"""
-        if func_node.name.startswith('_') and not func_node.name.startswith('_compute'):
-            is_private = True
-        else:
-            is_private = False
-        
-        # Check decorators
-        is_api_model = False
-        is_api_depends = False
-        is_api_onchange = False
-        is_api_constrains = False
-        depends_fields = []
-        onchange_fields = []
-        
-        for decorator in func_node.decorator_list:
-            if isinstance(decorator, ast.Attribute):
-                if decorator.attr == 'model':
-                    is_api_model = True
-            elif isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute):
-                if decorator.func.attr == 'depends':
-                    is_api_depends = True
-                    depends_fields = [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
-                elif decorator.func.attr == 'onchange':
-                    is_api_onchange = True
-                    onchange_fields = [arg.value for arg in decorator.args if isinstance(arg, ast.Constant)]
-                elif decorator.func.attr == 'constrains':
-                    is_api_constrains = True
-        
-        # Determine if it's an action method (likely a button)
-        is_action = func_node.name.startswith('action_') or func_node.name.startswith('button_')
-        
-        return {
-            'name': func_node.name,
-            'is_private': is_private,
-            'is_action': is_action,
-            'is_compute': is_api_depends or func_node.name.startswith('_compute'),
-            'is_onchange': is_api_onchange,
-            'is_constraint': is_api_constrains,
-            'depends_fields': depends_fields,
-            'onchange_fields': onchange_fields,
-        }
+    def _parse_python_models(self, py_file):
+        """Parse Python file and extract model definitions"""
+        scanned = self._scan_python_file(py_file)
+        if not scanned:
+            return []
+        # Callers decorate the model dicts, keep the cached ones clean
+        return [dict(model_info) for model_info in scanned['models']]
 
     @api.model
     def _parse_views(self, xml_file):
@@ -438,28 +690,20 @@ class QACodeScanner(models.AbstractModel):
         view_info = {}
         
         try:
-            with open(xml_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find model for each view
-            model_pattern = r'<field name="model">([^<]+)</field>'
-            arch_pattern = r'<field name="arch"[^>]*>(.*?)</field>'
+            data = _read_source(xml_file)
+            if data is None:
+                return view_info
             
-            # Simple parsing - find buttons
-            button_pattern = r'<button[^>]*name=["\']([^"\']+)["\'][^>]*>'
-            buttons = re.findall(button_pattern, content)
-            
-            # Find fields used in views
-            field_pattern = r'<field[^>]*name=["\']([^"\']+)["\']'
-            fields = re.findall(field_pattern, content)
-            
-            # Try to associate with model
-            models = re.findall(model_pattern, content)
-            for model in models:
-                if model not in view_info:
-                    view_info[model] = {'buttons': [], 'fields': []}
-                view_info[model]['buttons'].extend(buttons)
-                view_info[model]['fields'].extend(fields)
+            key = _source_key('views', data)
+            cached = _PARSE_CACHE.get(key)
+            if cached is not None:
+                return {model: dict(info) for model, info in cached.items()}
+            try:
+                view_info = _parse_view_records(data)
+            except etree.XMLSyntaxError:
+                # Broken XML still gets the plain pattern matching
+                view_info = _match_view_patterns(data.decode('utf-8'))
+            _PARSE_CACHE[key] = {model: dict(info) for model, info in view_info.items()}
         
         except Exception as e:
             _logger.warning(f"Failed to parse view {xml_file}: {e}")
@@ -472,13 +716,11 @@ class QACodeScanner(models.AbstractModel):
         rules = []
         
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            if lines:
+            with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
                 # Skip header
-                for line in lines[1:]:
-                    parts = line.strip().split(',')
+                next(reader, None)
+                for parts in reader:
                     if len(parts) >= 6:
                         rules.append({
                             'id': parts[0],
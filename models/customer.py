@@ -2,6 +2,135 @@
 
 from odoo import models, fields, api
 from odoo.exceptions import UserError
+from odoo.tools.sql import create_index
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+import json
+import requests
+
+from ..tools.json_utils import json_loads
+
+# Preferred server environments for running customer tests, lowest first
+_ENV_PRIORITY = {'staging': 0, 'uat': 1, 'development': 2, 'production': 3}
+
+_VIEW_ACTION_TEMPLATE = {'type': 'ir.actions.act_window', 'target': 'current'}
+
+# Server fields needed by a connection test
+_PROBE_FIELDS = ['name', 'url', 'database', 'auth_type', 'username', 'password', 'api_key']
+
+# Bodies of the parameterless JSON-RPC calls, serialized once
+_VERSION_INFO_BODY = json.dumps({"jsonrpc": "2.0", "method": "call", "params": {}, "id": 1}).encode()
+_SESSION_INFO_BODY = json.dumps({"jsonrpc": "2.0", "method": "call", "params": {}, "id": 3}).encode()
+
+_HTTP_SESSION = None
+
+
+def _http_session():
+    """HTTP session shared by server connection tests, connections are kept alive between calls"""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=16)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Content-Type'] = 'application/json'
+        # Never replay an authenticated session cookie into another test
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        _HTTP_SESSION = session
+    return _HTTP_SESSION
+
+
+def _connection_failed(message):
+    return 'failed', 'Connection Failed', message, 'danger'
+
+
+def _probe_server(server):
+    """Run the connection checks of a server read() dict, returns (status, title, message, notification type)"""
+    session = _http_session()
+    url = server['url']
+    
+    try:
+        # Step 1: Test basic connectivity, a bodyless HEAD fails fast on dead hosts
+        head_response = session.head(url, timeout=2, allow_redirects=False)
+        head_response.close()
+        if head_response.status_code >= 500:
+            return _connection_failed(f"Server not reachable: HTTP {head_response.status_code}")
+        
+        version_url = f"{url}/web/webclient/version_info"
+        response = session.post(version_url, data=_VERSION_INFO_BODY, timeout=10)
+        
+        if response.status_code != 200:
+            return _connection_failed(f"Server not reachable: HTTP {response.status_code}")
+        
+        version_data = json_loads(response.content)
+        server_version = version_data.get('result', {}).get('server_version', 'Unknown')
+        
+        # Step 2: Test authentication if credentials provided
+        if server['auth_type'] == 'password' and server['username'] and server['password']:
+            auth_url = f"{url}/web/session/authenticate"
+            auth_response = session.post(
+                auth_url,
+                json={
+                    "jsonrpc": "2.0",
+                    "method": "call",
+                    "params": {
+                        "db": server['database'],
+                        "login": server['username'],
+                        "password": server['password'],
+                    },
+                    "id": 2
+                },
+                timeout=15
+            )
+            
+            if auth_response.status_code != 200:
+                return _connection_failed(f"Authentication request failed: HTTP {auth_response.status_code}")
+            
+            auth_data = json_loads(auth_response.content)
+            
+            # Check for error in response
+            if auth_data.get('error'):
+                error_msg = auth_data['error'].get('data', {}).get('message', str(auth_data['error']))
+                return _connection_failed(f"Authentication failed: {error_msg}")
+            
+            # Check if we got a valid uid
+            result = auth_data.get('result', {})
+            uid = result.get('uid')
+            
+            if not uid:
+                return _connection_failed("Authentication failed: Invalid username or password")
+            
+            return ('connected', 'Success',
+                    f"Connected to {url}\nOdoo {server_version}\nDatabase: {server['database']}\n"
+                    f"User: {server['username']} (UID: {uid})", 'success')
+        
+        elif server['auth_type'] == 'api_key' and server['api_key']:
+            # Test API key by making a simple call
+            test_url = f"{url}/web/session/get_session_info"
+            test_response = session.post(
+                test_url,
+                data=_SESSION_INFO_BODY,
+                headers={'Authorization': f"Bearer {server['api_key']}"},
+                timeout=10
+            )
+            
+            if test_response.status_code != 200:
+                return _connection_failed("API key validation failed")
+            return 'connected', 'Success', f'Connected to {url}\nOdoo {server_version}\nAPI Key validated', 'success'
+        
+        # No credentials, just test connectivity
+        return ('connected', 'Partial Success',
+                f'Server reachable: {url}\nOdoo {server_version}\n\n'
+                f'Note: No credentials configured for authentication test.', 'warning')
+    
+    except requests.exceptions.Timeout:
+        return _connection_failed(f"Connection timed out: {url}")
+    except requests.exceptions.ConnectionError as e:
+        return _connection_failed(f"Cannot connect to server: {url}\n\nError: {str(e)}")
+    except Exception as e:
+        return _connection_failed(f"Connection failed: {str(e)}")
 
 
 class QACustomer(models.Model):
@@ -44,11 +173,11 @@ class QACustomer(models.Model):
                                 string='Test Suites')
     
     # Statistics
-    server_count = fields.Integer(compute='_compute_counts')
-    repository_count = fields.Integer(compute='_compute_counts')
-    spec_count = fields.Integer(compute='_compute_counts')
-    test_count = fields.Integer(compute='_compute_counts')
-    suite_count = fields.Integer(compute='_compute_counts')
+    server_count = fields.Integer(compute='_compute_simple_counts', store=True)
+    repository_count = fields.Integer(compute='_compute_simple_counts', store=True)
+    spec_count = fields.Integer(compute='_compute_simple_counts', store=True)
+    test_count = fields.Integer(compute='_compute_test_count', store=True)
+    suite_count = fields.Integer(compute='_compute_simple_counts', store=True)
     last_run_date = fields.Datetime(compute='_compute_last_run', store=True)
     last_run_status = fields.Selection([
         ('pending', 'Pending'),
@@ -67,107 +196,159 @@ class QACustomer(models.Model):
         ('code_unique', 'UNIQUE(code)', 'Customer code must be unique'),
     ]
 
-    @api.depends('server_ids', 'repository_ids', 'spec_ids', 'suite_ids', 'spec_ids.test_case_ids')
-    def _compute_counts(self):
+    @api.depends('server_ids', 'repository_ids', 'spec_ids', 'suite_ids',
+                 'server_ids.active', 'repository_ids.active', 'spec_ids.active', 'suite_ids.active')
+    def _compute_simple_counts(self):
+        if not self:
+            return
+        customer_ids = self._origin.ids
+        counts = defaultdict(dict)
+        if customer_ids:
+            for model in ('qa.customer.server', 'qa.git.repository', 'qa.test.spec', 'qa.test.suite'):
+                self.env[model].flush_model(['customer_id', 'active'])
+            # Active records of each collection per customer, in a single round trip
+            self.env.cr.execute("""
+                SELECT 'server', customer_id, COUNT(*) FROM qa_customer_server
+                WHERE customer_id = ANY(%(ids)s) AND active GROUP BY customer_id
+                UNION ALL
+                SELECT 'repository', customer_id, COUNT(*) FROM qa_git_repository
+                WHERE customer_id = ANY(%(ids)s) AND active GROUP BY customer_id
+                UNION ALL
+                SELECT 'spec', customer_id, COUNT(*) FROM qa_test_spec
+                WHERE customer_id = ANY(%(ids)s) AND active GROUP BY customer_id
+                UNION ALL
+                SELECT 'suite', customer_id, COUNT(*) FROM qa_test_suite
+                WHERE customer_id = ANY(%(ids)s) AND active GROUP BY customer_id
+            """, {'ids': customer_ids})
+            for kind, customer_id, count in self.env.cr.fetchall():
+                counts[kind][customer_id] = count
+        
         for record in self:
-            record.server_count = len(record.server_ids)
-            record.repository_count = len(record.repository_ids)
-            record.spec_count = len(record.spec_ids)
-            record.suite_count = len(record.suite_ids)
-            record.test_count = sum(len(spec.test_case_ids) for spec in record.spec_ids)
+            customer_id = record._origin.id
+            record.server_count = counts['server'].get(customer_id, 0)
+            record.repository_count = counts['repository'].get(customer_id, 0)
+            record.spec_count = counts['spec'].get(customer_id, 0)
+            record.suite_count = counts['suite'].get(customer_id, 0)
+
+    @api.depends('spec_ids.active', 'spec_ids.test_case_ids', 'spec_ids.test_case_ids.active')
+    def _compute_test_count(self):
+        if not self:
+            return
+        customer_ids = self._origin.ids
+        test_counts = {}
+        if customer_ids:
+            # Test cases are counted through the customer specifications
+            self.env['qa.test.spec'].flush_model(['customer_id', 'active'])
+            self.env['qa.test.case'].flush_model(['spec_id', 'active'])
+            self.env.cr.execute("""
+                SELECT spec.customer_id, COUNT(*)
+                FROM qa_test_case test_case
+                JOIN qa_test_spec spec ON spec.id = test_case.spec_id
+                WHERE spec.customer_id = ANY(%s) AND spec.active AND test_case.active
+                GROUP BY spec.customer_id
+            """, (customer_ids,))
+            test_counts = dict(self.env.cr.fetchall())
+        
+        for record in self:
+            record.test_count = test_counts.get(record._origin.id, 0)
 
     @api.depends('suite_ids.run_ids')
     def _compute_last_run(self):
+        if not self:
+            return
+        customer_ids = self._origin.ids
+        last_runs = {}
+        if customer_ids:
+            # Latest run of each customer in one query, runs with a start_time
+            # first and the most recent run by id as fallback
+            self.env['qa.test.suite'].flush_model(['customer_id', 'active'])
+            self.env['qa.test.run'].flush_model(['suite_id', 'start_time', 'state', 'active'])
+            self.env.cr.execute("""
+                SELECT DISTINCT ON (suite.customer_id) suite.customer_id, run.start_time, run.state
+                FROM qa_test_run run
+                JOIN qa_test_suite suite ON suite.id = run.suite_id
+                WHERE suite.customer_id = ANY(%s) AND suite.active AND run.active
+                ORDER BY suite.customer_id, run.start_time DESC NULLS LAST, run.id DESC
+            """, (customer_ids,))
+            last_runs = {customer_id: (start_time, state) for customer_id, start_time, state in self.env.cr.fetchall()}
+        
         for record in self:
-            # Search for runs with start_time first
-            runs = self.env['qa.test.run'].search([
-                ('suite_id', 'in', record.suite_ids.ids),
-                ('start_time', '!=', False)
-            ], order='start_time desc', limit=1)
-            
-            # Fallback to any run if none have start_time
-            if not runs:
-                runs = self.env['qa.test.run'].search([
-                    ('suite_id', 'in', record.suite_ids.ids)
-                ], order='id desc', limit=1)
-            
-            if runs:
-                record.last_run_date = runs[0].start_time
-                record.last_run_status = runs[0].state
-            else:
-                record.last_run_date = False
-                record.last_run_status = False
+            record.last_run_date, record.last_run_status = last_runs.get(record._origin.id, (False, False))
 
     @api.depends('suite_ids.run_ids.pass_rate')
     def _compute_pass_rate(self):
+        if not self:
+            return
+        customer_ids = self._origin.ids
+        rates = {}
+        if customer_ids:
+            # Average over the last 10 finished runs of each customer, done by the database
+            self.env['qa.test.suite'].flush_model(['customer_id', 'active'])
+            self.env['qa.test.run'].flush_model(['suite_id', 'start_time', 'state', 'pass_rate', 'active'])
+            self.env.cr.execute("""
+                SELECT customer_id, AVG(pass_rate)
+                FROM (
+                    SELECT suite.customer_id, COALESCE(run.pass_rate, 0) AS pass_rate,
+                           ROW_NUMBER() OVER (PARTITION BY suite.customer_id
+                                              ORDER BY run.start_time DESC, run.id DESC) AS rank
+                    FROM qa_test_run run
+                    JOIN qa_test_suite suite ON suite.id = run.suite_id
+                    WHERE suite.customer_id = ANY(%s) AND suite.active AND run.active
+                      AND run.state IN ('passed', 'failed')
+                ) last_runs
+                WHERE rank <= 10
+                GROUP BY customer_id
+            """, (customer_ids,))
+            rates = dict(self.env.cr.fetchall())
+        
         for record in self:
-            runs = self.env['qa.test.run'].search([
-                ('suite_id', 'in', record.suite_ids.ids),
-                ('state', 'in', ['passed', 'failed'])
-            ], order='start_time desc', limit=10)
-            if runs:
-                record.pass_rate = sum(r.pass_rate for r in runs) / len(runs)
-            else:
-                record.pass_rate = 0.0
+            record.pass_rate = rates.get(record._origin.id) or 0.0
 
-    def action_view_specs(self):
-        """View customer's test specifications"""
-        self.ensure_one()
+    def _make_view_action(self, suffix, res_model, view_mode):
+        """Window action listing the records of res_model linked to this customer"""
         return {
-            'type': 'ir.actions.act_window',
-            'name': f'{self.name} - Specifications',
-            'res_model': 'qa.test.spec',
-            'view_mode': 'list,kanban,form',
+            **_VIEW_ACTION_TEMPLATE,
+            'name': f'{self.name} - {suffix}',
+            'res_model': res_model,
+            'view_mode': view_mode,
             'domain': [('customer_id', '=', self.id)],
             'context': {'default_customer_id': self.id},
         }
 
+    def action_view_specs(self):
+        """View customer's test specifications"""
+        self.ensure_one()
+        return self._make_view_action('Specifications', 'qa.test.spec', 'list,kanban,form')
+
     def action_view_suites(self):
         """View customer's test suites"""
         self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': f'{self.name} - Test Suites',
-            'res_model': 'qa.test.suite',
-            'view_mode': 'list,form',
-            'domain': [('customer_id', '=', self.id)],
-            'context': {'default_customer_id': self.id},
-        }
+        return self._make_view_action('Test Suites', 'qa.test.suite', 'list,form')
 
     def action_view_servers(self):
         """View customer's servers"""
         self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': f'{self.name} - Servers',
-            'res_model': 'qa.customer.server',
-            'view_mode': 'list,form',
-            'domain': [('customer_id', '=', self.id)],
-            'context': {'default_customer_id': self.id},
-        }
+        return self._make_view_action('Servers', 'qa.customer.server', 'list,form')
 
     def action_run_all_tests(self):
         """Run all test suites for this customer"""
         self.ensure_one()
-        if not self.suite_ids:
+        # Stored counter, no need to load the suites
+        if not self.suite_count:
             raise UserError("No test suites defined for this customer")
         
-        # Get all test cases from all suites
-        all_test_cases = self.env['qa.test.case'].search([
+        # Get all test cases from all suites, only their ids are needed
+        test_case_ids = list(self.env['qa.test.case']._search([
             ('customer_id', '=', self.id),
             ('state', '=', 'ready'),
-        ])
+        ]))
         
-        if not all_test_cases:
+        if not test_case_ids:
             raise UserError("No ready test cases found for this customer")
         
         # Get default server (prefer staging/uat)
-        default_server_id = False
-        if self.server_ids:
-            servers = self.server_ids.sorted(
-                lambda s: {'staging': 0, 'uat': 1, 'development': 2, 'production': 3}.get(s.environment, 4)
-            )
-            default_server_id = servers[0].id if servers else False
+        default_server = min(self.server_ids, key=lambda s: _ENV_PRIORITY.get(s.environment, 4), default=False)
+        default_server_id = default_server.id if default_server else False
         
         # Open wizard to select server and run
         return {
@@ -179,22 +360,25 @@ class QACustomer(models.Model):
             'context': {
                 'default_customer_id': self.id,
                 'default_server_id': default_server_id,
-                'default_test_case_ids': [(6, 0, all_test_cases.ids)],
+                'default_test_case_ids': [(6, 0, test_case_ids)],
             },
         }
 
     def action_scan_and_generate(self):
         """Open code scan wizard to scan repos and generate tests"""
         self.ensure_one()
-        if not self.repository_ids:
+        # First repository in the default order, only its branch is needed
+        repositories = self.env['qa.git.repository'].search_read(
+            [('customer_id', '=', self.id)], ['branch'], limit=1)
+        if not repositories:
             raise UserError("No Git repositories configured for this customer. "
                           "Please add a repository in Configuration > Git Repositories first.")
         
         # Create a new code scan and open it
         scan = self.env['qa.code.scan'].create({
             'customer_id': self.id,
-            'repository_id': self.repository_ids[0].id,
-            'branch': self.repository_ids[0].branch or 'main',
+            'repository_id': repositories[0]['id'],
+            'branch': repositories[0]['branch'] or 'main',
         })
         
         return {
@@ -265,132 +449,57 @@ class QACustomerServer(models.Model):
         ('failed', 'Failed'),
     ], string='Connection', default='untested')
 
+    def init(self):
+        # Covers the customer_id lookups as well as the default ordering
+        create_index(self.env.cr, 'qa_customer_server_customer_id_sequence_index',
+                     self._table, ['customer_id', 'sequence'])
+
     def test_connection(self):
         """Test connection to Odoo server"""
         self.ensure_one()
-        import requests
-        import json
+        status, title, message, notification_type = _probe_server(self.read(_PROBE_FIELDS)[0])
+        # Failures are reported as a notification, raising would roll the status back
+        self.write({'connection_status': status})
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'type': notification_type,
+                'sticky': status == 'failed',
+            }
+        }
+
+    def test_connection_batch(self):
+        """Test connection to several Odoo servers at once"""
+        if not self:
+            return False
+        servers = self.read(_PROBE_FIELDS)
+        # Probes only wait on the network, run them side by side
+        with ThreadPoolExecutor(max_workers=min(16, len(servers))) as pool:
+            results = list(pool.map(_probe_server, servers))
         
-        try:
-            # Step 1: Test basic connectivity
-            version_url = f"{self.url}/web/webclient/version_info"
-            response = requests.post(
-                version_url,
-                json={"jsonrpc": "2.0", "method": "call", "params": {}, "id": 1},
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                self.connection_status = 'failed'
-                raise UserError(f"Server not reachable: HTTP {response.status_code}")
-            
-            version_data = response.json()
-            server_version = version_data.get('result', {}).get('server_version', 'Unknown')
-            
-            # Step 2: Test authentication if credentials provided
-            if self.auth_type == 'password' and self.username and self.password:
-                auth_url = f"{self.url}/web/session/authenticate"
-                auth_response = requests.post(
-                    auth_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "method": "call",
-                        "params": {
-                            "db": self.database,
-                            "login": self.username,
-                            "password": self.password,
-                        },
-                        "id": 2
-                    },
-                    headers={'Content-Type': 'application/json'},
-                    timeout=15
-                )
-                
-                if auth_response.status_code != 200:
-                    self.connection_status = 'failed'
-                    raise UserError(f"Authentication request failed: HTTP {auth_response.status_code}")
-                
-                auth_data = auth_response.json()
-                
-                # Check for error in response
-                if auth_data.get('error'):
-                    error_msg = auth_data['error'].get('data', {}).get('message', str(auth_data['error']))
-                    self.connection_status = 'failed'
-                    raise UserError(f"Authentication failed: {error_msg}")
-                
-                # Check if we got a valid uid
-                result = auth_data.get('result', {})
-                uid = result.get('uid')
-                
-                if not uid:
-                    self.connection_status = 'failed'
-                    raise UserError("Authentication failed: Invalid username or password")
-                
-                self.connection_status = 'connected'
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Success',
-                        'message': f'Connected to {self.url}\nOdoo {server_version}\nDatabase: {self.database}\nUser: {self.username} (UID: {uid})',
-                        'type': 'success',
-                        'sticky': False,
-                    }
-                }
-            
-            elif self.auth_type == 'api_key' and self.api_key:
-                # Test API key by making a simple call
-                test_url = f"{self.url}/web/session/get_session_info"
-                test_response = requests.post(
-                    test_url,
-                    json={"jsonrpc": "2.0", "method": "call", "params": {}, "id": 3},
-                    headers={
-                        'Content-Type': 'application/json',
-                        'Authorization': f'Bearer {self.api_key}',
-                    },
-                    timeout=10
-                )
-                
-                if test_response.status_code == 200:
-                    self.connection_status = 'connected'
-                    return {
-                        'type': 'ir.actions.client',
-                        'tag': 'display_notification',
-                        'params': {
-                            'title': 'Success',
-                            'message': f'Connected to {self.url}\nOdoo {server_version}\nAPI Key validated',
-                            'type': 'success',
-                        }
-                    }
-                else:
-                    self.connection_status = 'failed'
-                    raise UserError("API key validation failed")
-            
-            else:
-                # No credentials, just test connectivity
-                self.connection_status = 'connected'
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Partial Success',
-                        'message': f'Server reachable: {self.url}\nOdoo {server_version}\n\nNote: No credentials configured for authentication test.',
-                        'type': 'warning',
-                    }
-                }
-                
-        except requests.exceptions.Timeout:
-            self.connection_status = 'failed'
-            raise UserError(f"Connection timed out: {self.url}")
-        except requests.exceptions.ConnectionError as e:
-            self.connection_status = 'failed'
-            raise UserError(f"Cannot connect to server: {self.url}\n\nError: {str(e)}")
-        except UserError:
-            raise
-        except Exception as e:
-            self.connection_status = 'failed'
-            raise UserError(f"Connection failed: {str(e)}")
+        ids_by_status = defaultdict(list)
+        failures = []
+        for server, (status, title, message, notification_type) in zip(servers, results):
+            ids_by_status[status].append(server['id'])
+            if status == 'failed':
+                failures.append(f"{server['name']}: {message}")
+        for status, ids in ids_by_status.items():
+            self.browse(ids).write({'connection_status': status})
+        
+        summary = f'{len(servers) - len(failures)} of {len(servers)} servers reachable'
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Connection Test',
+                'message': '\n'.join([summary] + failures),
+                'type': 'warning' if failures else 'success',
+                'sticky': bool(failures),
+            }
+        }
 
     def action_view_runs(self):
         """View test runs on this server"""
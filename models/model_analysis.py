@@ -21,6 +21,7 @@ class QAModelAnalysis(models.Model):
     has_constraints = fields.Boolean(string='Has Constraints')
     
     analysis_json = fields.Text(string='Full Analysis (JSON)')
+    analysis_json_display = fields.Text(string='Full Analysis', compute='_compute_analysis_json_display')
     suggested_tests = fields.Text(string='Suggested Tests', compute='_compute_suggested_tests')
     test_count = fields.Integer(string='Generated Tests')
     
@@ -28,6 +29,15 @@ class QAModelAnalysis(models.Model):
     customer_id = fields.Many2one(related='module_id.customer_id', store=True)
     scan_id = fields.Many2one(related='module_id.scan_id', store=True)
 
+    @api.depends('analysis_json')
+    def _compute_analysis_json_display(self):
+        """Indented copy of the stored (compact) analysis for the form view"""
+        for record in self:
+            try:
+                record.analysis_json_display = json.dumps(json.loads(record.analysis_json), indent=2, ensure_ascii=False)
+            except (TypeError, ValueError):
+                record.analysis_json_display = record.analysis_json or ''
+
     @api.depends('analysis_json')
     def _compute_suggested_tests(self):
         for record in self:
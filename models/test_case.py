@@ -169,8 +169,9 @@ class QATestCase(models.Model):
         for record in self:
             results = record.result_ids
             record.total_runs = len(results)
-            record.pass_count = len(results.filtered(lambda r: r.status == 'passed'))
-            record.fail_count = len(results.filtered(lambda r: r.status == 'failed'))
+            statuses = results.mapped('status')
+            record.pass_count = statuses.count('passed')
+            record.fail_count = statuses.count('failed')
             record.pass_rate = (record.pass_count / record.total_runs * 100) if record.total_runs else 0
             durations = results.mapped('duration')
             record.avg_duration = sum(durations) / len(durations) if durations else 0
@@ -1,11 +1,24 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from datetime import timedelta
 import base64
+import json
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Jenkins build result -> qa.test.run state
+_JENKINS_STATUS_MAP = {
+    'SUCCESS': 'passed',
+    'FAILURE': 'failed',
+    'UNSTABLE': 'failed',
+    'ABORTED': 'cancelled',
+}
+
+# Failed Jenkins reports are kept this long for inspection
+_INBOX_ERROR_RETENTION = timedelta(days=30)
+
 
 class QATestResult(models.Model):
     _name = 'qa.test.result'
@@ -198,3 +211,93 @@ class QATestStepResult(models.Model):
     duration = fields.Float(string='Duration (s)')
     message = fields.Text(string='Message')
     screenshot = fields.Binary(string='Screenshot')
+
+
+class QATestResultInbox(models.Model):
+    _name = 'qa.test.result.inbox'
+    _description = 'Pending Jenkins Results'
+    _order = 'id'
+
+    run_id = fields.Many2one('qa.test.run', string='Test Run',
+                             required=True, ondelete='cascade')
+    build_number = fields.Integer(string='Jenkins Build #')
+    jenkins_status = fields.Char(string='Jenkins Status')
+    payload = fields.Text(string='Results (JSON)')
+
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('error', 'Error'),
+    ], string='Status', default='pending', required=True)
+    error_message = fields.Text(string='Error Message')
+
+    @api.model
+    def _cron_process_inbox(self):
+        """Cron job to apply the Jenkins results queued by the webhook"""
+        pending = self.search([('state', '=', 'pending')])
+        if not pending:
+            return
+        try:
+            with self.env.cr.savepoint():
+                pending._process()
+            # Processed reports are not needed anymore, drop their payload
+            pending.unlink()
+            return
+        except Exception as e:
+            _logger.warning("Batch processing of Jenkins results failed, retrying one by one: %s", e)
+
+        for inbox in pending:
+            try:
+                with self.env.cr.savepoint():
+                    inbox._process()
+                inbox.unlink()
+            except Exception as e:
+                _logger.error("Error processing Jenkins results for run %s: %s", inbox.run_id.id, e)
+                inbox.write({'state': 'error', 'error_message': str(e)})
+
+    @api.autovacuum
+    def _gc_failed_inbox(self):
+        """Purge the failed reports past their retention, processed ones are deleted right away"""
+        self.search([
+            ('state', '=', 'error'),
+            ('write_date', '<', fields.Datetime.now() - _INBOX_ERROR_RETENTION),
+        ]).unlink()
+
+    def _process(self):
+        """Update the runs status and create their test results in one batch"""
+        # Only the newest report of a run sets its status
+        latest = {}
+        for inbox in self.sorted('id'):
+            latest[inbox.run_id.id] = inbox
+        # Runs sharing the same outcome are updated with a single write
+        run_groups = {}
+        for inbox in latest.values():
+            key = (_JENKINS_STATUS_MAP.get(inbox.jenkins_status, 'error'), inbox.build_number)
+            run_groups.setdefault(key, self.env['qa.test.run'])
+            run_groups[key] |= inbox.run_id
+        for (state, build_number), runs in run_groups.items():
+            runs.write({'state': state, 'jenkins_build_number': build_number})
+
+        run_results = [(inbox.run_id.id, json.loads(inbox.payload or '[]')) for inbox in self]
+        test_ids = {r.get('test_id') for _run_id, results in run_results for r in results if r.get('test_id')}
+        if not test_ids:
+            return
+        # Single array-bound lookup, first case in qa.test.case order wins
+        self.env['qa.test.case'].flush_model(['test_id', 'active', 'sequence'])
+        self.env.cr.execute("""
+            SELECT id, test_id FROM qa_test_case
+            WHERE test_id = ANY(%s) AND active
+            ORDER BY sequence, id
+        """, (list(test_ids),))
+        by_test_id = {}
+        for case_id, test_id in self.env.cr.fetchall():
+            by_test_id.setdefault(test_id, case_id)
+
+        vals_list = [{
+            'test_case_id': by_test_id[r['test_id']],
+            'run_id': run_id,
+            'status': r.get('status', 'error'),
+            'duration': r.get('duration', 0),
+            'message': r.get('message', ''),
+        } for run_id, results in run_results for r in results if r.get('test_id') in by_test_id]
+        if vals_list:
+            self.env['qa.test.result'].create(vals_list)
@@ -26,7 +26,7 @@ class QATestRun(models.Model):
                                  help='Server where tests were executed')
     
     # Run configuration
-    suite_id = fields.Many2one('qa.test.suite', string='Test Suite')
+    suite_id = fields.Many2one('qa.test.suite', string='Test Suite', index=True)
     test_case_ids = fields.Many2many('qa.test.case', string='Test Cases')
     
     # Configuration
@@ -68,7 +68,7 @@ class QATestRun(models.Model):
     ], string='Status', default='pending', tracking=True)
     
     # Timing
-    start_time = fields.Datetime(string='Start Time')
+    start_time = fields.Datetime(string='Start Time', index=True)
     end_time = fields.Datetime(string='End Time')
     duration = fields.Float(string='Duration (s)', compute='_compute_duration', store=True)
     duration_display = fields.Char(string='Duration', compute='_compute_duration_display')
@@ -147,12 +147,12 @@ class QATestRun(models.Model):
     @api.depends('result_ids', 'result_ids.status')
     def _compute_statistics(self):
         for run in self:
-            results = run.result_ids
-            run.total_tests = len(results)
-            run.passed_tests = len(results.filtered(lambda r: r.status == 'passed'))
-            run.failed_tests = len(results.filtered(lambda r: r.status == 'failed'))
-            run.error_tests = len(results.filtered(lambda r: r.status == 'error'))
-            run.skipped_tests = len(results.filtered(lambda r: r.status == 'skipped'))
+            statuses = run.result_ids.mapped('status')
+            run.total_tests = len(statuses)
+            run.passed_tests = statuses.count('passed')
+            run.failed_tests = statuses.count('failed')
+            run.error_tests = statuses.count('error')
+            run.skipped_tests = statuses.count('skipped')
             run.pass_rate = (run.passed_tests / run.total_tests * 100) if run.total_tests else 0
 
     def action_execute(self):
@@ -19,7 +19,7 @@ class QATestSuite(models.Model):
     
     # Customer
     customer_id = fields.Many2one('qa.customer', string='Customer',
-                                   ondelete='cascade',
+                                   ondelete='cascade', index=True,
                                    help='Customer this suite belongs to')
     
     # Code Scan (for code-first generation)
@@ -18,12 +18,20 @@ class AIGenerator:
         Args:
             config: qa.test.ai.config record
         """
-        self.config = config
+        self.config_id = config.id
         self.api_key = config.api_key
         self.model = config.api_model
         self.endpoint = config.api_endpoint
         self.max_tokens = config.max_tokens
         self.temperature = config.temperature
+        self._session = None
+    
+    def _get_session(self):
+        """HTTP session kept alive across calls to the AI provider"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
     
     def test_connection(self) -> bool:
         """Test connection to AI provider"""
@@ -186,8 +194,6 @@ IMPORTANT:
     
     def _call_api(self, prompt: str) -> str:
         """Call the AI API and return the response"""
-        import requests
-        
         headers = {
             'Content-Type': 'application/json',
             'x-api-key': self.api_key,
@@ -203,7 +209,7 @@ IMPORTANT:
             ]
         }
         
-        response = requests.post(
+        response = self._get_session().post(
             self.endpoint,
             headers=headers,
             json=data,
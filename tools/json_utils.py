@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tools import date_utils
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data):
+    """Serialize data to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=date_utils.json_default,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(data, ensure_ascii=False, default=date_utils.json_default).encode()
+
+
+def json_loads(data):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)